@@ -0,0 +1,72 @@
+import json
+import sqlite3
+import hashlib
+from typing import Dict, Any, Optional
+
+def content_hash(thread: Dict[str, Any]) -> str:
+    """Hash of the text analyze_thread reads"""
+    text = json.dumps([thread.get("title", ""), thread.get("selftext", "")])
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+class AnalysisCache:
+    """SQLite-backed cache of analyze_thread results keyed by thread id.
+
+    An entry is only served when both the thread's title/selftext hash and the
+    analyzer fingerprint match, so editing a post or tuning the lexicons
+    invalidates it automatically. One entry is kept per thread.
+    """
+
+    def __init__(self, path: str, fingerprint: str):
+        self.path = path
+        self.fingerprint = fingerprint
+        self.hits = 0
+        self.misses = 0
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS analyses ("
+            " thread_id TEXT PRIMARY KEY,"
+            " content_hash TEXT NOT NULL,"
+            " fingerprint TEXT NOT NULL,"
+            " result TEXT NOT NULL)"
+        )
+        self.conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self) -> None:
+        self.conn.commit()
+        self.conn.close()
+
+    def get(self, thread: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Cached {"sentiment", "bird_terms", "courses"} for an unchanged thread, or None"""
+        row = self.conn.execute(
+            "SELECT content_hash, fingerprint, result FROM analyses WHERE thread_id = ?", (thread["id"],)
+        ).fetchone()
+        if row and row[0] == content_hash(thread) and row[1] == self.fingerprint:
+            self.hits += 1
+            return json.loads(row[2])
+        self.misses += 1
+        return None
+
+    def put(self, analyzed_thread: Dict[str, Any]) -> None:
+        result = {
+            "sentiment": analyzed_thread["sentiment"],
+            "bird_terms": analyzed_thread["bird_terms"],
+            "courses": analyzed_thread["courses"]
+        }
+        self.conn.execute(
+            "INSERT OR REPLACE INTO analyses (thread_id, content_hash, fingerprint, result) VALUES (?, ?, ?, ?)",
+            (analyzed_thread["id"], content_hash(analyzed_thread), self.fingerprint, json.dumps(result))
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
@@ -0,0 +1,191 @@
+import os
+import sys
+import json
+import time
+import argparse
+import datetime
+import platform
+import numpy as np
+from typing import List, Dict, Any, Callable, Optional
+from sentiment_analyzer import SentimentAnalyzer
+from course_details_analyzer import extract_key_course_attributes
+from synthetic_corpus import generate_corpus
+from json_output import save_to_json
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks", "baseline.json")
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process so far, in MB"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def time_calls(items: List[Any], call: Callable[[Any], Any]) -> Dict[str, Any]:
+    """Run call on every item, timing each one; returns throughput and latency percentiles"""
+    latencies = []
+    for item in items:
+        start = time.perf_counter()
+        call(item)
+        latencies.append(time.perf_counter() - start)
+
+    latencies_ms = np.array(latencies) * 1000
+    total = float(np.sum(latencies))
+    return {
+        "calls": len(items),
+        "total_seconds": round(total, 4),
+        "per_second": round(len(items) / total, 2) if total else None,
+        "p50_ms": round(float(np.percentile(latencies_ms, 50)), 3),
+        "p90_ms": round(float(np.percentile(latencies_ms, 90)), 3),
+        "p99_ms": round(float(np.percentile(latencies_ms, 99)), 3),
+        "max_ms": round(float(np.max(latencies_ms)), 3),
+        "peak_rss_mb": peak_rss_mb()
+    }
+
+def run_benchmark(threads: List[Dict[str, Any]], ranking_repeats: int = 5, detail_courses: int = 50) -> Dict[str, Any]:
+    """Time analyze_thread, get_course_rankings and extract_key_course_attributes on a corpus"""
+    start = time.perf_counter()
+    analyzer = SentimentAnalyzer()
+    init_seconds = time.perf_counter() - start
+
+    # analyze_thread, one call per thread, starting from an empty VADER score cache
+    analyzer.clear_score_cache()
+    analyzed_threads = []
+    analyze = time_calls(threads, lambda thread: analyzed_threads.append(analyzer.analyze_thread(thread)))
+
+    # get_course_rankings over the whole corpus, repeated for a latency distribution
+    rankings = time_calls(range(ranking_repeats), lambda _: analyzer.get_course_rankings(analyzed_threads))
+
+    # extract_key_course_attributes for the most discussed courses
+    threads_by_course = {}
+    for thread in analyzed_threads:
+        for course in thread["courses"]:
+            threads_by_course.setdefault(course, []).append(thread)
+    busiest = sorted(threads_by_course, key=lambda course: len(threads_by_course[course]), reverse=True)[:detail_courses]
+    details = time_calls(busiest, lambda course: extract_key_course_attributes(threads_by_course[course], analyzer))
+
+    return {
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "threads": len(threads),
+        "courses": len(threads_by_course),
+        "init_seconds": round(init_seconds, 4),
+        "stages": {
+            "analyze_thread": analyze,
+            "get_course_rankings": rankings,
+            "extract_key_course_attributes": details
+        },
+        "peak_rss_mb": peak_rss_mb()
+    }
+
+def compare_to_baseline(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Stages whose throughput, median latency or memory got worse than the baseline by more than tolerance"""
+    regressions = []
+    for stage, result in report["stages"].items():
+        base = baseline.get("stages", {}).get(stage)
+        if not base:
+            continue
+        if base["per_second"] and result["per_second"] and result["per_second"] < base["per_second"] * (1 - tolerance):
+            regressions.append(f"{stage}: {result['per_second']}/s vs baseline {base['per_second']}/s")
+        if result["p50_ms"] > base["p50_ms"] * (1 + tolerance):
+            regressions.append(f"{stage}: p50 {result['p50_ms']} ms vs baseline {base['p50_ms']} ms")
+    if report["peak_rss_mb"] and baseline.get("peak_rss_mb") and report["peak_rss_mb"] > baseline["peak_rss_mb"] * (1 + tolerance):
+        regressions.append(f"peak RSS {report['peak_rss_mb']:.1f} MB vs baseline {baseline['peak_rss_mb']:.1f} MB")
+    return regressions
+
+def check_workers(threads: List[Dict[str, Any]], workers: int) -> List[str]:
+    """Differences between analyzing threads serially and with worker processes (results and work counters)"""
+    serial, parallel = SentimentAnalyzer(), SentimentAnalyzer()
+    serial_threads = serial.analyze_threads(threads)
+    parallel_threads = parallel.analyze_threads(threads, workers=workers)
+
+    problems = []
+    mismatched = sum(a != b for a, b in zip(serial_threads, parallel_threads))
+    if mismatched:
+        problems.append(f"{mismatched} of {len(threads)} analyzed threads differ")
+    for name in sorted(set(serial.counters) | set(parallel.counters)):
+        # Each worker has its own VADER score cache, so workers legitimately make more VADER calls
+        if name != "vader_calls" and serial.counters[name] != parallel.counters[name]:
+            problems.append(f"{name}: {serial.counters[name]} serial vs {parallel.counters[name]} with {workers} workers")
+    return problems
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(f"{report['threads']} threads, {report['courses']} courses, analyzer init {report['init_seconds']:.2f}s")
+    print(f"{'stage':<32}{'calls':>7}{'per sec':>11}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for stage, result in report["stages"].items():
+        print(f"{stage:<32}{result['calls']:>7}{result['per_second'] or 0:>11.1f}{result['p50_ms']:>10.2f}"
+              f"{result['p90_ms']:>10.2f}{result['p99_ms']:>10.2f}{result['max_ms']:>10.2f}")
+    if report["peak_rss_mb"] is not None:
+        print(f"Peak RSS: {report['peak_rss_mb']:.1f} MB")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the analysis hot paths on a synthetic corpus')
+    parser.add_argument('--threads', type=int, default=2000, help='Number of synthetic threads')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed for the synthetic corpus')
+    parser.add_argument('--corpus', help='Benchmark this JSON file of threads instead of a synthetic corpus')
+    parser.add_argument('--ranking-repeats', type=int, default=5, help='Times to run get_course_rankings')
+    parser.add_argument('--detail-courses', type=int, default=50,
+                        help='Number of busiest courses to run extract_key_course_attributes on')
+    parser.add_argument('--output', help='Also write the report to this JSON file')
+    parser.add_argument('--baseline-file', default=BASELINE_FILE, help='Baseline report to save or compare against')
+    parser.add_argument('--save-baseline', action='store_true', help='Save this run as the baseline')
+    parser.add_argument('--compare', action='store_true',
+                        help='Compare against the baseline and exit with status 1 on a regression')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='Allowed slowdown or memory growth relative to the baseline (0.2 = 20%%)')
+    parser.add_argument('--check-workers', type=int,
+                        help='Also check that analysis with this many worker processes matches a serial run, '
+                             'counters included (exit 1 if not)')
+
+    args = parser.parse_args()
+
+    if args.corpus:
+        with open(args.corpus, 'r') as f:
+            threads = json.load(f)
+    else:
+        threads = generate_corpus(args.threads, args.seed)
+
+    report = run_benchmark(threads, args.ranking_repeats, args.detail_courses)
+    report["corpus"] = args.corpus or f"synthetic:{args.threads}:{args.seed}"
+    print_report(report)
+
+    if args.check_workers:
+        problems = check_workers(threads, args.check_workers)
+        if problems:
+            print(f"Analysis with {args.check_workers} workers does not match a serial run:")
+            for problem in problems:
+                print(f"  {problem}")
+            sys.exit(1)
+        print(f"Analysis with {args.check_workers} workers matches a serial run")
+
+    if args.output:
+        save_to_json(report, args.output)
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline_file)), exist_ok=True)
+        save_to_json(report, args.baseline_file)
+
+    if args.compare:
+        if not os.path.exists(args.baseline_file):
+            print(f"No baseline at {args.baseline_file}; run with --save-baseline first")
+            sys.exit(1)
+        with open(args.baseline_file, 'r') as f:
+            baseline = json.load(f)
+        if baseline.get("corpus") != report["corpus"]:
+            print(f"Warning: baseline was measured on {baseline.get('corpus')}, this run on {report['corpus']}")
+        regressions = compare_to_baseline(report, baseline, args.tolerance)
+        if regressions:
+            print("Regressions against the baseline:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print("No regressions against the baseline")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+import string
+import numpy as np
+from typing import List, Dict, Any
+
+# Columnar course tables are plain {column: np.ndarray} dicts with one row per course.
+# The formulas below are single vectorized expressions over those columns, so scoring
+# thousands of courses (for example while tuning weights) is a handful of array ops.
+
+RANKING_COLUMNS = [
+    "code", "department", "mentions", "score", "compound", "pos", "neu", "neg",
+    "bird_term_sum", "title_mentions", "total_comments", "thread_count"
+]
+
+DETAIL_COLUMNS = [
+    "code", "department", "compound", "pos", "neg", "specific_mentions", "bird_term_sum",
+    "thread_count", "title_mentions", "avg_comments", "total_score", "exam_difficulty_mentioned",
+    "midterm_mentions", "final_mentions", "difficulty_mentions", "workload_mentions",
+    "bird_course_mentions", "failure_mentions", "negative_title_sentiment"
+]
+
+def build_table(rows: List[Dict[str, Any]], columns: List[str]) -> Dict[str, np.ndarray]:
+    """Turn per-course feature dicts into a columnar table"""
+    return {column: np.array([row[column] for row in rows]) for column in columns}
+
+def course_numbers(codes: np.ndarray) -> np.ndarray:
+    """Numeric part of each course code (CP102 -> 102), 0 when there is none"""
+    codes = np.asarray(codes, dtype=str)
+    if codes.size == 0:
+        return np.zeros(0, dtype=int)
+    digits = np.char.lstrip(codes, string.ascii_letters)
+    numeric = np.char.isdigit(digits)
+    return np.where(numeric, digits, "0").astype(int)
+
+def level_adjustments(codes: np.ndarray) -> np.ndarray:
+    """Penalty for upper-year courses: -0.5 at the 300 level and above, -0.3 at the 200 level"""
+    numbers = course_numbers(codes)
+    return np.select([numbers >= 300, numbers >= 200], [-0.5, -0.3], 0.0)
+
+def department_adjustments(departments: np.ndarray, adjustments: Dict[str, float]) -> np.ndarray:
+    return np.array([adjustments.get(dept, 0) for dept in departments], dtype=float)
+
+def comment_factors(avg_comments: np.ndarray) -> np.ndarray:
+    return np.minimum(0.5, np.maximum(-0.5, (avg_comments - 10) / -20))
+
+def ranking_scores(table: Dict[str, np.ndarray], dept_adjustments: Dict[str, float]) -> Dict[str, np.ndarray]:
+    """bird_score and its components for the rankings stage"""
+    mentions = table["mentions"]
+    divisor = np.where(mentions > 0, mentions, 1)
+    compound = table["compound"] / divisor
+    pos = table["pos"] / divisor
+    neu = table["neu"] / divisor
+    neg = table["neg"] / divisor
+    bird_term_score = table["bird_term_sum"] / divisor
+
+    title_bonus = table["title_mentions"] * 0.3
+    dept_adjustment = department_adjustments(table["department"], dept_adjustments)
+    thread_count = table["thread_count"]
+    avg_comments = np.where(thread_count > 0, table["total_comments"] / np.maximum(thread_count, 1), 0)
+    comment_factor = comment_factors(avg_comments)
+    level_adjustment = level_adjustments(table["code"])
+
+    bird_score = (
+        (compound * 2.5) +
+        (np.minimum(1.5, mentions / 5)) +
+        (pos * 2) -
+        (neg * 3) +
+        (bird_term_score * 1.5) +
+        (np.minimum(0.8, table["score"] / 50)) +
+        title_bonus +
+        dept_adjustment +
+        comment_factor +
+        level_adjustment
+    )
+
+    return {
+        "compound": compound,
+        "pos": pos,
+        "neu": neu,
+        "neg": neg,
+        "bird_score": bird_score,
+        "bird_term_score": bird_term_score,
+        "dept_adjustment": dept_adjustment,
+        "comment_factor": comment_factor,
+        "level_adjustment": level_adjustment
+    }
+
+def detail_scores(table: Dict[str, np.ndarray], dept_adjustments: Dict[str, float]) -> Dict[str, np.ndarray]:
+    """bird_score and its components for the course detail stage, clamped to 0-10"""
+    threads = table["thread_count"]
+    divisor = np.maximum(threads, 1)
+    bird_term_score = np.where(threads > 0, table["bird_term_sum"] / divisor, table["bird_term_sum"])
+    avg_score = np.where(threads > 0, table["total_score"] / divisor, 0)
+
+    title_bonus = table["title_mentions"] * 0.3
+    dept_adjustment = department_adjustments(table["department"], dept_adjustments)
+    comment_factor = comment_factors(table["avg_comments"])
+    level_adjustment = level_adjustments(table["code"])
+
+    # Exams weigh more when their difficulty is discussed explicitly
+    exam_mentions = table["midterm_mentions"] + table["final_mentions"]
+    assessment_penalty = 0 - np.where(table["exam_difficulty_mentioned"], exam_mentions * 0.15, exam_mentions * 0.05)
+
+    # Bird course mentions positively affect score, but difficulty and workload negatively affect it
+    topic_adjustment = (
+        (table["bird_course_mentions"] * 0.4) -
+        (table["difficulty_mentions"] * 0.25) -
+        (table["workload_mentions"] * 0.15)
+    )
+    failure_penalty = -0.4 * table["failure_mentions"] / divisor
+
+    bird_score = (
+        (table["compound"] * 2.0) +                          # Reduced weight of compound sentiment
+        (np.minimum(1.2, table["specific_mentions"] / 5)) +  # Mentions factor
+        (table["pos"] * 1.5) -                               # Positive sentiment
+        (table["neg"] * 4.0) +                               # Increased weight of negative sentiment
+        (bird_term_score * 1.0) +                            # Reduced weight of bird terms
+        (np.minimum(0.6, avg_score / 50)) +                  # Reddit score
+        title_bonus +                                        # Title mentions
+        dept_adjustment +                                    # Department adjustment
+        comment_factor +                                     # Comment factor
+        level_adjustment +                                   # Course level adjustment
+        topic_adjustment +                                   # Topic-based adjustment
+        assessment_penalty +                                 # Assessment penalty
+        failure_penalty +                                    # Failure mentions penalty
+        table["negative_title_sentiment"]                    # Title sentiment penalty
+    )
+
+    return {
+        "bird_score": np.maximum(0, np.minimum(10, bird_score)),
+        "bird_term_score": bird_term_score,
+        "dept_adjustment": dept_adjustment,
+        "comment_factor": comment_factor,
+        "level_adjustment": level_adjustment,
+        "topic_adjustment": topic_adjustment,
+        "assessment_penalty": assessment_penalty,
+        "failure_penalty": failure_penalty
+    }
+
+def table_rows(columns: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+    """Convert columnar results back to one dict of plain Python numbers per course"""
+    names = list(columns)
+    return [dict(zip(names, values)) for values in zip(*(columns[name].tolist() for name in names))]
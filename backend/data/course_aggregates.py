@@ -0,0 +1,447 @@
+import os
+import json
+import heapq
+import datetime
+import string
+import hashlib
+from typing import List, Dict, Any, Iterable, Optional, Set, Tuple
+from json_output import encode_json, write_atomic
+from thread_store import TIME_PERIODS, parse_created
+
+# Bump when the saved state layout changes; older files are ignored and rebuilt
+STATE_VERSION = 4
+
+# Score fields kept per course, in the order SentimentAnalyzer.score_courses returns them
+SCORE_FIELDS = (
+    "compound", "pos", "neu", "neg", "bird_score",
+    "bird_term_score", "dept_adjustment", "comment_factor", "level_adjustment"
+)
+
+# Running sums kept per department and per hundred-level; see CourseAggregates.rollups
+ROLLUP_FIELDS = ("courses", "mentions", "threads", "score", "bird_score", "compound")
+
+def course_level(code: str) -> str:
+    """Hundred-level of a course code (CP104 -> "100", BU481 -> "400")"""
+    return code.lstrip(string.ascii_letters)[:1] + "00"
+
+def thread_fingerprint(thread: Dict[str, Any]) -> str:
+    """Hash of the thread fields that feed its ranking contribution"""
+    key = json.dumps([thread.get("title"), thread.get("selftext"), thread.get("score"), thread.get("url")])
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+class Contribution:
+    """One thread's analysis of one course; its weighted sums are derived on demand"""
+    __slots__ = ("mentions", "compound", "pos", "neu", "neg", "title_mention", "bird_terms")
+
+    def __init__(self, mentions: int, compound: float, pos: float, neu: float, neg: float,
+                 title_mention: Optional[bool], bird_terms: Tuple[Tuple[int, int], ...]):
+        self.mentions = mentions
+        self.compound = compound
+        self.pos = pos
+        self.neu = neu
+        self.neg = neg
+        self.title_mention = title_mention  # None when the analysis did not report it
+        self.bird_terms = bird_terms        # (term id, count) pairs
+
+    def to_state(self) -> list:
+        return [self.mentions, self.compound, self.pos, self.neu, self.neg, self.title_mention,
+                [list(pair) for pair in self.bird_terms]]
+
+    @classmethod
+    def from_state(cls, state: list) -> "Contribution":
+        mentions, compound, pos, neu, neg, title_mention, bird_terms = state
+        return cls(mentions, compound, pos, neu, neg, title_mention, tuple(tuple(pair) for pair in bird_terms))
+
+class ThreadEntry:
+    """A thread folded into the aggregates; courses refer to it by its integer index"""
+    __slots__ = ("id", "fingerprint", "title", "url", "score", "weight", "courses")
+
+    def __init__(self, thread_id: str, fingerprint: str, title: str, url: str, score: int, weight: float = 1):
+        self.id = thread_id
+        self.fingerprint = fingerprint
+        self.title = title
+        self.url = url
+        self.score = score
+        self.weight = weight  # scales everything the thread adds to the sums (time decay)
+        self.courses = {}     # code -> Contribution
+
+class CourseRecord:
+    """Running sums for one course"""
+    __slots__ = ("code", "mentions", "score", "compound", "pos", "neu", "neg", "title_mentions",
+                 "bird_terms", "threads", "scores", "rollup")
+
+    def __init__(self, code: str):
+        self.code = code
+        self.mentions = 0
+        self.score = 0
+        self.compound = 0
+        self.pos = 0
+        self.neu = 0
+        self.neg = 0
+        self.title_mentions = 0
+        self.bird_terms = {}  # term id -> count, in first-seen order
+        self.threads = {}     # thread index -> None, an insertion-ordered set
+        self.scores = None    # SCORE_FIELDS values from the last scoring
+        self.rollup = None    # ROLLUP_FIELDS values this course added to its rollups
+
+class CourseAggregates:
+    """Running per-course sums behind get_course_rankings.
+
+    Every analyzed thread's contribution is remembered per course, so a new or edited
+    thread is folded in by retracting its old contribution and applying the new one.
+    Only the courses it touches are re-scored; the state can be saved between runs.
+    sync() rebuilds the state when the analyzer's analysis fingerprint has changed,
+    since the saved contributions were computed with the old lexicons and adjustments.
+
+    Courses and contributions are slotted records, bird terms are interned to integer
+    ids and courses refer to threads by index; rankings() builds the public dicts.
+
+    Department and hundred-level rollups are kept as running sums too: each scored course
+    adds its figures to its two groups and takes them back out when it is re-scored or
+    removed, so rollups() never has to walk the course list.
+    """
+
+    def __init__(self):
+        self.terms = []         # term id -> term
+        self.term_ids = {}      # term -> term id
+        self.entries = {}       # thread index -> ThreadEntry
+        self.thread_index = {}  # thread id -> thread index
+        self.next_index = 0
+        self.courses = {}       # code -> CourseRecord
+        self.rollup_sums = {"departments": {}, "levels": {}}  # group -> key -> ROLLUP_FIELDS sums
+        self.scoring_fingerprint = None
+        self.analysis_fingerprint = None  # analyzer the contributions came from, see sync()
+        self.dirty = set()
+
+    @classmethod
+    def load(cls, path: str) -> "CourseAggregates":
+        """Load saved state, or start empty if there is none or it was saved in an older format"""
+        aggregates = cls()
+        if not os.path.exists(path):
+            return aggregates
+        with open(path, 'r') as f:
+            state = json.load(f)
+        if state.get("version") != STATE_VERSION:
+            print(f"Ignoring {path} from an older version; course aggregates will be rebuilt")
+            return aggregates
+
+        aggregates.terms = state["terms"]
+        aggregates.term_ids = {term: term_id for term_id, term in enumerate(aggregates.terms)}
+        for index, thread_id, fingerprint, title, url, score, weight, courses in state["threads"]:
+            entry = ThreadEntry(thread_id, fingerprint, title, url, score, weight)
+            entry.courses = {code: Contribution.from_state(contribution) for code, contribution in courses}
+            aggregates.entries[index] = entry
+            aggregates.thread_index[thread_id] = index
+        aggregates.next_index = state["next_index"]
+
+        for code, sums, bird_terms, threads, scores, rollup in state["courses"]:
+            course = CourseRecord(code)
+            (course.mentions, course.score, course.compound, course.pos,
+             course.neu, course.neg, course.title_mentions) = sums
+            course.bird_terms = {term_id: count for term_id, count in bird_terms}
+            course.threads = dict.fromkeys(threads)
+            course.scores = tuple(scores) if scores is not None else None
+            aggregates.courses[code] = course
+            if rollup is not None:
+                aggregates._roll(course, tuple(rollup))
+        aggregates.scoring_fingerprint = state.get("scoring_fingerprint")
+        aggregates.analysis_fingerprint = state.get("analysis_fingerprint")
+        aggregates.dirty = {code for code, course in aggregates.courses.items() if course.scores is None}
+        return aggregates
+
+    def save(self, path: str) -> None:
+        write_atomic(encode_json({
+            "version": STATE_VERSION,
+            "terms": self.terms,
+            "next_index": self.next_index,
+            "threads": [
+                [index, entry.id, entry.fingerprint, entry.title, entry.url, entry.score, entry.weight,
+                 [[code, contribution.to_state()] for code, contribution in entry.courses.items()]]
+                for index, entry in self.entries.items()
+            ],
+            "courses": [
+                [code,
+                 [course.mentions, course.score, course.compound, course.pos,
+                  course.neu, course.neg, course.title_mentions],
+                 [[term_id, count] for term_id, count in course.bird_terms.items()],
+                 list(course.threads),
+                 course.scores,
+                 course.rollup]
+                for code, course in self.courses.items()
+            ],
+            "scoring_fingerprint": self.scoring_fingerprint,
+            "analysis_fingerprint": self.analysis_fingerprint
+        }, pretty=False), path)
+
+    def term_id(self, term: str) -> int:
+        term_id = self.term_ids.get(term)
+        if term_id is None:
+            term_id = self.term_ids[term] = len(self.terms)
+            self.terms.append(term)
+        return term_id
+
+    def apply(self, threads: Iterable[Dict[str, Any]], weight: float = 1) -> Set[str]:
+        """Fold analyzed threads in, replacing any earlier contribution; returns touched courses.
+
+        weight scales the threads' mentions, score, title mentions and bird terms (time decay)."""
+        touched = set()
+        for thread in threads:
+            if thread["id"] in self.thread_index:
+                touched |= self._retract(thread["id"])
+            touched |= self._apply(thread, weight)
+        self.dirty |= touched
+        return touched
+
+    def retract(self, thread_ids: Iterable[str]) -> Set[str]:
+        """Remove the contribution of threads that left the corpus; returns touched courses"""
+        touched = set()
+        for thread_id in thread_ids:
+            if thread_id in self.thread_index:
+                touched |= self._retract(thread_id)
+        self.dirty |= touched
+        return touched
+
+    def sync(self, threads: Iterable[Dict[str, Any]], analysis_fingerprint: str = None) -> Set[str]:
+        """Make the state match exactly this corpus, touching only new, edited or removed threads.
+
+        If analysis_fingerprint (SentimentAnalyzer.analysis_fingerprint) differs from the one
+        the state was built with, the state is rebuilt from these threads instead. threads may be a
+        generator; it is consumed once, keeping only each id's position. Touched courses have their
+        threads re-ordered by that position, so they list threads in input order like a fresh build."""
+        if analysis_fingerprint != self.analysis_fingerprint and self.thread_index:
+            # Rebuild from scratch rather than retracting, so the sums match a fresh build exactly
+            print("Analyzer configuration changed; rebuilding the course aggregates")
+            self.__init__()
+        self.analysis_fingerprint = analysis_fingerprint
+        position = {}
+        touched = set()
+        for thread in threads:
+            position[thread["id"]] = len(position)
+            index = self.thread_index.get(thread["id"])
+            if index is None or self.entries[index].fingerprint != thread_fingerprint(thread):
+                touched |= self.apply([thread])
+        touched |= self.retract([thread_id for thread_id in self.thread_index if thread_id not in position])
+
+        # Re-applied and new threads were appended; put them back at their input position
+        for code in touched:
+            course = self.courses.get(code)
+            if course is not None:
+                course.threads = dict.fromkeys(sorted(course.threads,
+                                                      key=lambda index: position[self.entries[index].id]))
+        return touched
+
+    def _apply(self, thread: Dict[str, Any], weight: float) -> Set[str]:
+        index = self.next_index
+        self.next_index += 1
+        entry = ThreadEntry(thread["id"], thread_fingerprint(thread), thread["title"], thread["url"], thread["score"],
+                            weight)
+
+        for code, sentiment in thread.get("courses", {}).items():
+            contribution = Contribution(
+                sentiment["mentions"], sentiment["compound"], sentiment["pos"], sentiment["neu"], sentiment["neg"],
+                sentiment.get("title_mention"),
+                tuple((self.term_id(term), count) for term, count in sentiment.get("bird_terms", {}).items())
+            )
+            course = self.courses.get(code)
+            if course is None:
+                course = self.courses[code] = CourseRecord(code)
+
+            # weight is the int 1 unless decay is on, so unweighted sums keep their exact values
+            mentions = contribution.mentions * weight
+            course.mentions += mentions
+            course.compound += contribution.compound * mentions
+            course.pos += contribution.pos * mentions
+            course.neu += contribution.neu * mentions
+            course.neg += contribution.neg * mentions
+            course.score += entry.score * weight
+            course.title_mentions += weight if contribution.title_mention else 0
+            for term_id, count in contribution.bird_terms:
+                course.bird_terms[term_id] = course.bird_terms.get(term_id, 0) + count * weight
+            course.threads[index] = None
+
+            entry.courses[code] = contribution
+
+        self.entries[index] = entry
+        self.thread_index[entry.id] = index
+        return set(entry.courses)
+
+    def _retract(self, thread_id: str) -> Set[str]:
+        index = self.thread_index.pop(thread_id)
+        entry = self.entries.pop(index)
+        for code, contribution in entry.courses.items():
+            course = self.courses[code]
+            weight = entry.weight
+            mentions = contribution.mentions * weight
+            course.mentions -= mentions
+            course.compound -= contribution.compound * mentions
+            course.pos -= contribution.pos * mentions
+            course.neu -= contribution.neu * mentions
+            course.neg -= contribution.neg * mentions
+            course.score -= entry.score * weight
+            course.title_mentions -= weight if contribution.title_mention else 0
+            for term_id, count in contribution.bird_terms:
+                remaining = course.bird_terms.get(term_id, 0) - count * weight
+                if remaining > 0:
+                    course.bird_terms[term_id] = remaining
+                else:
+                    course.bird_terms.pop(term_id, None)
+            course.threads.pop(index, None)
+
+            if not course.threads:
+                self._roll(course, None)
+                del self.courses[code]
+        return set(entry.courses)
+
+    def _roll(self, course: CourseRecord, rollup: Optional[Tuple]) -> None:
+        """Replace the course's contribution to its department and level rollups (None removes it)"""
+        keys = (("departments", course.code[:2]), ("levels", course_level(course.code)))
+        for group, key in keys:
+            groups = self.rollup_sums[group]
+            if course.rollup is not None:
+                sums = groups[key]
+                for i, value in enumerate(course.rollup):
+                    sums[i] -= value
+                if not sums[0]:
+                    # Last course of the group; dropping it also drops any float drift
+                    del groups[key]
+            if rollup is not None:
+                sums = groups.setdefault(key, [0] * len(ROLLUP_FIELDS))
+                for i, value in enumerate(rollup):
+                    sums[i] += value
+        course.rollup = rollup
+
+    def rollups(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Per-department and per-level totals and averages as of the last rankings() call.
+
+        threads counts (course, thread) pairs, so a thread naming two courses of a group counts twice."""
+        result = {}
+        for group, groups in self.rollup_sums.items():
+            result[group] = {}
+            for key in sorted(groups):
+                courses, mentions, threads, score, bird_score, compound = groups[key]
+                result[group][key] = {
+                    "courses": courses,
+                    "mentions": mentions,
+                    "threads": threads,
+                    "score": score,
+                    "avg_mentions": round(mentions / courses, 4),
+                    "avg_bird_score": round(bird_score / courses, 4),
+                    "avg_compound": round(compound / courses, 4)
+                }
+        return result
+
+    def bird_terms(self, course: CourseRecord) -> Dict[str, int]:
+        return {self.terms[term_id]: count for term_id, count in course.bird_terms.items()}
+
+    def thread_info(self, index: int, code: str) -> Dict[str, Any]:
+        """The public per-course thread reference"""
+        entry = self.entries[index]
+        contribution = entry.courses[code]
+        thread_info = {
+            "id": entry.id,
+            "title": entry.title,
+            "url": entry.url,
+            "score": entry.score,
+            "sentiment": contribution.compound
+        }
+        if contribution.title_mention is not None:
+            thread_info["title_mention"] = contribution.title_mention
+        return thread_info
+
+    def rankings(self, analyzer, top: int = None) -> List[Dict[str, Any]]:
+        """Course records sorted by bird_score, re-scoring only courses touched since the last call.
+
+        With top, only the best `top` courses are selected (a partial heap selection rather
+        than a full sort) and built into records; ties keep the order of the full sort."""
+        fingerprint = analyzer.config_fingerprint()
+        if fingerprint != self.scoring_fingerprint:
+            self.dirty = set(self.courses)
+            self.scoring_fingerprint = fingerprint
+
+        dirty = [course for code, course in self.courses.items() if code in self.dirty]
+        scores = analyzer.score_courses([
+            {
+                "code": course.code,
+                "department": course.code[:2],
+                "mentions": course.mentions,
+                "score": course.score,
+                "compound": course.compound,
+                "pos": course.pos,
+                "neu": course.neu,
+                "neg": course.neg,
+                "bird_terms": self.bird_terms(course),
+                "title_mentions": course.title_mentions,
+                # Thread references do not keep comment counts
+                "total_comments": 0,
+                "thread_count": len(course.threads)
+            }
+            for course in dirty
+        ])
+        for course, scored in zip(dirty, scores):
+            course.scores = tuple(scored[field] for field in SCORE_FIELDS)
+            # Rollups use the published 0-10 bird_score scale
+            self._roll(course, (1, course.mentions, len(course.threads), course.score,
+                                min(10.0, scored["bird_score"]), scored["compound"]))
+        self.dirty = set()
+
+        bird_score = SCORE_FIELDS.index("bird_score")
+        if top is None:
+            selected = sorted(self.courses.values(), key=lambda course: course.scores[bird_score], reverse=True)
+        else:
+            selected = heapq.nlargest(top, self.courses.values(), key=lambda course: course.scores[bird_score])
+        return [self.record(course) for course in selected]
+
+    def record(self, course: CourseRecord) -> Dict[str, Any]:
+        """The public ranking record of a scored course"""
+        code = course.code
+        scored = dict(zip(SCORE_FIELDS, course.scores))
+        return {
+            "code": code,
+            "department": code[:2],
+            "mentions": course.mentions,
+            "score": course.score,
+            "compound": scored["compound"],
+            "pos": scored["pos"],
+            "neu": scored["neu"],
+            "neg": scored["neg"],
+            "bird_score": scored["bird_score"],
+            "bird_terms": self.bird_terms(course),
+            "threads": [self.thread_info(index, code) for index in course.threads],
+            "bird_term_score": scored["bird_term_score"],
+            "dept_adjustment": scored["dept_adjustment"],
+            "comment_factor": scored["comment_factor"],
+            "level_adjustment": scored["level_adjustment"]
+        }
+
+WINDOWS = ["week", "month", "year", "all"]
+
+class WindowedAggregates:
+    """Course aggregates for several trailing time windows, filled in one pass over a corpus.
+
+    Each analyzed thread is bucketed by its `created` age into every window that covers it
+    (threads without a timestamp only count towards "all"), so week/month/year/all rankings
+    come from a single pass instead of one fetch and analysis per time period. With a
+    half-life, a thread's contribution is also weighted by 0.5 ** (age / half-life).
+    """
+
+    def __init__(self, windows: Iterable[str] = WINDOWS, now: float = None, half_life_days: float = None):
+        self.spans = {}
+        for window in windows:
+            span = TIME_PERIODS[window]
+            self.spans[window] = span.total_seconds() if span is not None else None
+        self.now = now if now is not None else datetime.datetime.now(datetime.timezone.utc).timestamp()
+        self.half_life = half_life_days * 86400 if half_life_days else None
+        self.aggregates = {window: CourseAggregates() for window in self.spans}
+
+    def apply(self, threads: Iterable[Dict[str, Any]]) -> None:
+        for thread in threads:
+            created = parse_created(thread.get("created"))
+            age = max(0.0, self.now - created) if created is not None else None
+            weight = 0.5 ** (age / self.half_life) if self.half_life and age is not None else 1
+            for window, span in self.spans.items():
+                if span is None or (age is not None and age <= span):
+                    self.aggregates[window].apply([thread], weight)
+
+    def rankings(self, analyzer, top: int = None) -> Dict[str, List[Dict[str, Any]]]:
+        """window -> course records sorted by bird_score (see CourseAggregates.rankings)"""
+        return {window: aggregates.rankings(analyzer, top) for window, aggregates in self.aggregates.items()}
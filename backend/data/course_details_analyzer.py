@@ -5,25 +5,164 @@ import argparse
 import datetime
 import requests
 import re
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Iterator, Tuple, Set, FrozenSet
 from collections import Counter
+from itertools import chain
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from sentiment_analyzer import SentimentAnalyzer
+from bird_score import DETAIL_COLUMNS, build_table, course_numbers, detail_scores, table_rows
+from json_output import COMPRESSIONS, available_compressions, set_pretty, write_json
+from profiling import Profiler, add_profile_arguments
+from thread_corpus import ThreadCorpus
+from course_index import CourseIndex
+from ranking_pages import read_top_courses
+from http_client import DEFAULT_CONNECT_TIMEOUT, ServiceClient, print_request_stats
 
-def fetch_course_specific_threads(api_url: str, course_code: str, limit: int = 25) -> List[Dict[str, Any]]:
+# Word-bounded, case-insensitive alternatives for each course aspect the detail stage looks for
+TOPIC_PATTERNS = {
+    # Whether the course is offered online
+    "online": r'online|OC|distance|remote',
+    
+    # Common discussion topics for courses
+    "difficulty": r'difficult|hard|easy|tough|straightforward|challenging|simple|doable',
+    "workload": r'workload|lot of work|little work|time-consuming|minimal work|effort|hours|weekly',
+    "bird_course": r'bird course|bird|gpa booster|grade booster|easy course|easy 12|easy A|easy mark',
+    "content": r'content|material|lectures|readings|textbook|interesting|boring|enjoyable|concepts',
+    "structure": r'structure|organized|format|syllabus|outline|schedule|weekly|lecture|teaching style',
+    "grading": r'grading|grades|marking|curve|bell curve|scaled|fair|harsh|lenient|easy grader|tough grader',
+    
+    # Course components
+    "midterm": r'midterm|midterms|mid-term|mid term',
+    "final": r'final|finals|final exam|exam',
+    "assignment": r'assignment|assignments|homework',
+    "paper": r'paper|papers|essay|essays|report|reports|writing',
+    "quiz": r'quiz|quizzes|test|tests',
+    "lab": r'lab|labs|laboratory|practical',
+    "attendance": r'attendance|attend|attending|show up|present',
+    "participation": r'participation|participate|class discussion|discussion|contributing',
+    "presentation": r'presentation|presentations|present|presenting|slides',
+    "project": r'project|projects|assignment|term project',
+    "group": r'group|team|partner|group work|group project|group assignment',
+    
+    # Positive terms
+    "fair": r'fair|reasonable|manageable|balanced',
+    "interesting": r'interesting|engaging|fascinating|enjoyed|enjoyable|fun',
+    "helpful": r'helpful|useful|practical|valuable|worth it|worth taking',
+    "organized": r'organized|well-structured|clear|straightforward|well planned',
+    
+    # Negative terms
+    "boring": r'boring|dull|dry|tedious|monotonous|not interesting',
+    "useless": r'useless|pointless|waste|not worth|worthless',
+    "confusing": r'confusing|unclear|disorganized|messy|all over the place|no structure',
+    "stressful": r'stressful|stress|anxiety|overwhelming|too much|excessive',
+    
+    # Course assessment terms
+    "curved": r'curve|curved|bell curve|scaled|adjusting grades|adjusted',
+    "weight": r'weight|worth|percentage|percent|\d+%|portion|counts for',
+    "prerequisite": r'prerequisite|prereq|required|requirement|needed for|need to take|before taking'
+}
+
+class TopicScanner:
+    """Find every topic in TOPIC_PATTERNS that occurs in a text with one regex pass.
+
+    All alternatives are merged into a single lookahead alternation tried at each word
+    boundary, longest literal first. Any shorter alternative matching at the same spot
+    is a word-bounded prefix of that match, so the topics for each distinct match are
+    worked out once and memoized. Results equal running each `\b(?:...)\b` separately.
+    """
+
+    def __init__(self, topic_patterns: Dict[str, str]):
+        self.alternatives = {}
+        for topic, pattern in topic_patterns.items():
+            for alternative in pattern.split('|'):
+                self.alternatives.setdefault(alternative, set()).add(topic)
+        
+        ordered = sorted(self.alternatives, key=len, reverse=True)
+        self.pattern = re.compile(r'\b(?=((?:' + '|'.join(ordered) + r')\b)(.?))', re.IGNORECASE | re.DOTALL)
+        self._matchers = [(re.compile(alt + r'\b', re.IGNORECASE), topics) for alt, topics in self.alternatives.items()]
+        self._topics_by_match = {}
+
+    def _topics_for(self, key: str) -> FrozenSet[str]:
+        topics = self._topics_by_match.get(key)
+        if topics is None:
+            found = set()
+            for matcher, alternative_topics in self._matchers:
+                match = matcher.match(key)
+                # The trailing character only proves the boundary, it is never part of a hit
+                if match and match.end() <= len(key) - 1:
+                    found |= alternative_topics
+            topics = frozenset(found)
+            self._topics_by_match[key] = topics
+        return topics
+
+    def scan(self, text: str) -> Set[str]:
+        """Names of all topics mentioned anywhere in text"""
+        hits = set()
+        for matched, following in self.pattern.findall(text):
+            # Pad with a space at the end of the text, which is always a word boundary there
+            hits |= self._topics_for(matched + (following or ' '))
+        return hits
+
+TOPIC_SCANNER = TopicScanner(TOPIC_PATTERNS)
+
+def fetch_course_specific_threads(api_url: str, course_code: str, limit: int = 25,
+                                  client: ServiceClient = None, timeout: float = 30) -> List[Dict[str, Any]]:
     """Fetch threads that specifically mention a course code in the title"""
+    own_client = client is None
+    client = client or ServiceClient(read_timeout=timeout)
     try:
         endpoint = f"{api_url}/api/course-threads/{course_code}"
-        response = requests.get(endpoint, params={"limit": limit})
-        response.raise_for_status()  # Raise exception for HTTP errors
-        threads = response.json()
+        # All courses share one endpoint label so their latencies are reported together
+        threads = client.get_json(endpoint, endpoint="/api/course-threads/:courseCode", params={"limit": limit})
         print(f"Fetched {len(threads)} threads specifically about {course_code}")
         return threads
     except requests.exceptions.RequestException as e:
         print(f"Error fetching course-specific threads for {course_code}: {e}")
         return []
+    finally:
+        if own_client:
+            client.close()
+
+def fetch_course_threads_batch(api_url: str, course_codes: List[str], limit: int = 25,
+                               client: ServiceClient = None, timeout: float = 30) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+    """Yield (course_code, threads) groups as the batch endpoint streams them back.
+    
+    Threads that show up under several codes are yielded as the same dict object. Only
+    opening the stream is retried; a stream that breaks off part way is not resumed."""
+    threads_by_id = {}
+    own_client = client is None
+    client = client or ServiceClient(read_timeout=timeout)
+    try:
+        endpoint = f"{api_url}/api/course-threads"
+        response = client.post(endpoint, endpoint="/api/course-threads", json={"codes": course_codes, "limit": limit},
+                               stream=True)
+        
+        with response:
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                group = json.loads(line)
+                course_code = group["code"]
+                if "error" in group:
+                    print(f"Error fetching course-specific threads for {course_code}: {group['error']}")
+                    yield course_code, []
+                    continue
+                
+                threads = [threads_by_id.setdefault(t["id"], t) for t in group.get("threads", [])]
+                print(f"Fetched {len(threads)} threads specifically about {course_code}")
+                yield course_code, threads
+    except requests.exceptions.RequestException as e:
+        print(f"Error fetching course-specific threads in batch: {e}")
+    finally:
+        if own_client:
+            client.close()
+    
+    print(f"Batch fetch returned {len(threads_by_id)} unique threads for {len(course_codes)} courses")
 
 def extract_key_course_attributes(threads: List[Dict[str, Any]], analyzer: SentimentAnalyzer = None) -> Dict[str, Any]:
-    """Extract key course attributes from threads that specifically mention a course"""
+    """Extract key course attributes from threads that specifically mention a course.
+    
+    Threads should already carry analyze_thread's sentiment; any that do not are analyzed here."""
     if not threads:
         return {}
     
@@ -113,49 +252,6 @@ def extract_key_course_attributes(threads: List[Dict[str, Any]], analyzer: Senti
         "threads": threads
     }
     
-    # Patterns for detecting course aspects
-    online_pattern = re.compile(r'\b(?:online|OC|distance|remote)\b', re.IGNORECASE)
-    
-    # Common discussion topics for courses
-    topic_patterns = {
-        "difficulty": re.compile(r'\b(?:difficult|hard|easy|tough|straightforward|challenging|simple|doable)\b', re.IGNORECASE),
-        "workload": re.compile(r'\b(?:workload|lot of work|little work|time-consuming|minimal work|effort|hours|weekly)\b', re.IGNORECASE),
-        "bird_course": re.compile(r'\b(?:bird course|bird|gpa booster|grade booster|easy course|easy 12|easy A|easy mark)\b', re.IGNORECASE),
-        "content": re.compile(r'\b(?:content|material|lectures|readings|textbook|interesting|boring|enjoyable|concepts)\b', re.IGNORECASE),
-        "structure": re.compile(r'\b(?:structure|organized|format|syllabus|outline|schedule|weekly|lecture|teaching style)\b', re.IGNORECASE),
-        "grading": re.compile(r'\b(?:grading|grades|marking|curve|bell curve|scaled|fair|harsh|lenient|easy grader|tough grader)\b', re.IGNORECASE),
-        
-        # Course components
-        "midterm": re.compile(r'\b(?:midterm|midterms|mid-term|mid term)\b', re.IGNORECASE),
-        "final": re.compile(r'\b(?:final|finals|final exam|exam)\b', re.IGNORECASE),
-        "assignment": re.compile(r'\b(?:assignment|assignments|homework)\b', re.IGNORECASE),
-        "paper": re.compile(r'\b(?:paper|papers|essay|essays|report|reports|writing)\b', re.IGNORECASE),
-        "quiz": re.compile(r'\b(?:quiz|quizzes|test|tests)\b', re.IGNORECASE),
-        "lab": re.compile(r'\b(?:lab|labs|laboratory|practical)\b', re.IGNORECASE),
-        "attendance": re.compile(r'\b(?:attendance|attend|attending|show up|present)\b', re.IGNORECASE),
-        "participation": re.compile(r'\b(?:participation|participate|class discussion|discussion|contributing)\b', re.IGNORECASE),
-        "presentation": re.compile(r'\b(?:presentation|presentations|present|presenting|slides)\b', re.IGNORECASE),
-        "project": re.compile(r'\b(?:project|projects|assignment|term project)\b', re.IGNORECASE),
-        "group": re.compile(r'\b(?:group|team|partner|group work|group project|group assignment)\b', re.IGNORECASE),
-        
-        # Positive terms
-        "fair": re.compile(r'\b(?:fair|reasonable|manageable|balanced)\b', re.IGNORECASE),
-        "interesting": re.compile(r'\b(?:interesting|engaging|fascinating|enjoyed|enjoyable|fun)\b', re.IGNORECASE),
-        "helpful": re.compile(r'\b(?:helpful|useful|practical|valuable|worth it|worth taking)\b', re.IGNORECASE),
-        "organized": re.compile(r'\b(?:organized|well-structured|clear|straightforward|well planned)\b', re.IGNORECASE),
-        
-        # Negative terms
-        "boring": re.compile(r'\b(?:boring|dull|dry|tedious|monotonous|not interesting)\b', re.IGNORECASE),
-        "useless": re.compile(r'\b(?:useless|pointless|waste|not worth|worthless)\b', re.IGNORECASE),
-        "confusing": re.compile(r'\b(?:confusing|unclear|disorganized|messy|all over the place|no structure)\b', re.IGNORECASE),
-        "stressful": re.compile(r'\b(?:stressful|stress|anxiety|overwhelming|too much|excessive)\b', re.IGNORECASE),
-        
-        # Course assessment terms
-        "curved": re.compile(r'\b(?:curve|curved|bell curve|scaled|adjusting grades|adjusted)\b', re.IGNORECASE),
-        "weight": re.compile(r'\b(?:weight|worth|percentage|percent|\d+%|portion|counts for)\b', re.IGNORECASE),
-        "prerequisite": re.compile(r'\b(?:prerequisite|prereq|required|requirement|needed for|need to take|before taking)\b', re.IGNORECASE)
-    }
-    
     # Track total values to calculate average
     total_score = 0
     total_comments = 0
@@ -190,35 +286,38 @@ def extract_key_course_attributes(threads: List[Dict[str, Any]], analyzer: Senti
             except (ValueError, TypeError):
                 pass
         
+        # Find every topic mentioned in the thread in a single scan
+        topics = TOPIC_SCANNER.scan(full_text)
+        
         # Check for online/OC mentions
-        if online_pattern.search(full_text):
+        if "online" in topics:
             course_attributes["is_online_available"] = True
         
         # Check for topic mentions
         for topic in ["difficulty", "workload", "bird_course", "content", "structure", "grading"]:
-            if topic_patterns[topic].search(full_text):
+            if topic in topics:
                 course_attributes["discussion_topics"][topic] += 1
         
         # Check for course components
         # Exams
-        if topic_patterns["midterm"].search(full_text):
+        if "midterm" in topics:
             course_attributes["course_components"]["exams"]["midterm"] += 1
             course_attributes["course_components"]["exams"]["total"] += 1
-        if topic_patterns["final"].search(full_text):
+        if "final" in topics:
             course_attributes["course_components"]["exams"]["final"] += 1
             course_attributes["course_components"]["exams"]["total"] += 1
         
         # Assignments
-        if topic_patterns["assignment"].search(full_text):
+        if "assignment" in topics:
             course_attributes["course_components"]["assignments"]["count"] += 1
             course_attributes["course_components"]["assignments"]["total"] += 1
-        if topic_patterns["paper"].search(full_text):
+        if "paper" in topics:
             course_attributes["course_components"]["assignments"]["papers"] += 1
             course_attributes["course_components"]["assignments"]["total"] += 1
         
         # Other assessments
         for assessment in ["quiz", "lab", "attendance", "participation", "presentation", "project", "group"]:
-            if topic_patterns[assessment].search(full_text):
+            if assessment in topics:
                 # Fix for special pluralization cases
                 if assessment == "quiz":
                     key = "quizzes"
@@ -233,30 +332,30 @@ def extract_key_course_attributes(threads: List[Dict[str, Any]], analyzer: Senti
                 course_attributes["course_components"]["assessments"][key] += 1
         
         # Check for weight and difficulty mentions for assignments and exams
-        if topic_patterns["weight"].search(full_text):
-            if topic_patterns["midterm"].search(full_text) or topic_patterns["final"].search(full_text):
+        if "weight" in topics:
+            if "midterm" in topics or "final" in topics:
                 course_attributes["course_components"]["exams"]["weight_mentioned"] = True
-            if topic_patterns["assignment"].search(full_text) or topic_patterns["paper"].search(full_text):
+            if "assignment" in topics or "paper" in topics:
                 course_attributes["course_components"]["assignments"]["weight_mentioned"] = True
         
-        if topic_patterns["difficulty"].search(full_text):
-            if topic_patterns["midterm"].search(full_text) or topic_patterns["final"].search(full_text):
+        if "difficulty" in topics:
+            if "midterm" in topics or "final" in topics:
                 course_attributes["course_components"]["exams"]["difficulty_mentioned"] = True
-            if topic_patterns["assignment"].search(full_text) or topic_patterns["paper"].search(full_text):
+            if "assignment" in topics or "paper" in topics:
                 course_attributes["course_components"]["assignments"]["difficulty_mentioned"] = True
         
         # Check for prerequisite mentions
-        if topic_patterns["prerequisite"].search(full_text):
+        if "prerequisite" in topics:
             course_attributes["context_clues"]["pre_requisites_mentioned"] = True
         
         # Extract positive and negative aspects
         for term in ["fair", "interesting", "helpful", "organized"]:
-            if topic_patterns[term].search(full_text):
+            if term in topics:
                 course_attributes["sentiment_analysis"]["positive_aspects"][term] = \
                     course_attributes["sentiment_analysis"]["positive_aspects"].get(term, 0) + 1
         
         for term in ["boring", "useless", "confusing", "stressful"]:
-            if topic_patterns[term].search(full_text):
+            if term in topics:
                 course_attributes["sentiment_analysis"]["negative_aspects"][term] = \
                     course_attributes["sentiment_analysis"]["negative_aspects"].get(term, 0) + 1
     
@@ -270,14 +369,9 @@ def extract_key_course_attributes(threads: List[Dict[str, Any]], analyzer: Senti
         course_attributes["avg_thread_score"] = total_score / len(threads)
     
     # Check if year level is appropriate (300+ level courses should have upper-year discussions)
-    try:
-        numeric_part = re.search(r'\d+', course_code)
-        if numeric_part:
-            course_number = int(numeric_part.group())
-            if course_number >= 300 and course_attributes["discussion_topics"]["difficulty"] < 2:
-                course_attributes["context_clues"]["year_level_appropriate"] = False
-    except (ValueError, TypeError):
-        pass
+    course_number = int(course_numbers([course_code])[0])
+    if course_number >= 300 and course_attributes["discussion_topics"]["difficulty"] < 2:
+        course_attributes["context_clues"]["year_level_appropriate"] = False
     
     # Calculate overall sentiment
     # Positive factors: bird course mentions, positive aspects
@@ -307,15 +401,17 @@ def extract_key_course_attributes(threads: List[Dict[str, Any]], analyzer: Senti
         total_bird_terms = {}
         total_comments = 0
         
-        # Process each thread for sentiment analysis
+        # Process each thread for sentiment analysis, reusing what analyze_thread attached
+        # so every thread is scored by VADER only once per run
         for thread in threads:
-            full_text = f"{thread['title']} {thread['selftext']}"
-            
-            # Get sentiment scores using the analyzer
-            sentiment = analyzer.sia.polarity_scores(full_text)
+            if "sentiment" not in thread:
+                thread = analyzer.analyze_thread(thread)
+            sentiment = thread["sentiment"]
             
-            # Collect bird terms
-            thread_bird_terms = analyzer.detect_bird_terms_dict(full_text)
+            # Collect bird terms (threads analyzed before they were attached are matched here)
+            thread_bird_terms = thread.get("bird_terms")
+            if thread_bird_terms is None:
+                thread_bird_terms = analyzer.detect_bird_terms_dict(f"{thread['title']} {thread['selftext']}")
             for term, count in thread_bird_terms.items():
                 if term in total_bird_terms:
                     total_bird_terms[term] += count
@@ -362,83 +458,21 @@ def extract_key_course_attributes(threads: List[Dict[str, Any]], analyzer: Senti
     course_attributes["context_clues"]["terms"] = {term: count for term, count in term_counts.most_common(10)}
     
     # Calculate bird score similar to sentiment_analyzer.py get_course_rankings method
-    # Calculate bird term score
-    bird_term_score = 0
+    # Raw bird term score, normalized per thread by the vectorized formula
+    bird_term_sum = 0
     for term, count in course_attributes["sentiment_analysis"]["bird_terms"].items():
         if term.startswith("anti:"):
             # This is an anti-bird term
             actual_term = term[5:]  # Remove "anti:" prefix
-            bird_term_score += analyzer.anti_bird_terms.get(actual_term, 0) * count
+            bird_term_sum += analyzer.anti_bird_terms.get(actual_term, 0) * count
         else:
-            bird_term_score += analyzer.bird_terms.get(term, 0) * count
+            bird_term_sum += analyzer.bird_terms.get(term, 0) * count
     
-    # Normalize bird term score based on mentions
-    if len(threads) > 0:
-        bird_term_score /= len(threads)
-    
-    # Calculate title mention bonus - course code appears in title
-    title_mentions = sum(1 for thread in threads if course_code in thread.get("title", ""))
-    title_bonus = title_mentions * 0.3
-    
-    # Get department adjustment
-    dept_code = course_attributes["department"]
-    dept_adjustment = analyzer.department_adjustments.get(dept_code, 0)
-    
-    # Comment factor (negative for high comment counts)
-    comment_factor = min(0.5, max(-0.5, (avg_comments - 10) / -20))
-    
-    # Extract course number for level adjustment
-    course_number = 0
-    try:
-        numeric_part = re.search(r'\d+', course_code)
-        if numeric_part:
-            course_number = int(numeric_part.group())
-    except (ValueError, AttributeError):
-        pass
-    
-    # Higher course numbers generally indicate more advanced, potentially harder courses
-    level_adjustment = 0
-    if course_number >= 300:
-        level_adjustment = -0.5  # Harder senior-level courses
-    elif course_number >= 200:
-        level_adjustment = -0.3  # Moderately harder intermediate courses
-    elif course_number >= 100:
-        level_adjustment = 0     # No adjustment for first-year courses
-    
-    # Calculate bird score with all factors - improved algorithm
-    total_score = sum(thread.get("score", 0) for thread in threads)
-    avg_score = total_score / len(threads) if threads else 0
-    
-    # NEW: Additional penalty factors for courses with many mentions of difficult components
-    assessment_penalty = 0
-    
-    # Extract mentions of exams, assignments, etc.
-    exam_mentions = course_attributes["course_components"]["exams"]["total"]
-    midterm_mentions = course_attributes["course_components"]["exams"]["midterm"]
-    final_mentions = course_attributes["course_components"]["exams"]["final"]
-    
-    # Calculate assessment penalty based on mentions and difficulty
-    if course_attributes["course_components"]["exams"]["difficulty_mentioned"]:
-        # If difficulty of exams is explicitly mentioned, increase penalty
-        assessment_penalty -= (midterm_mentions + final_mentions) * 0.15
-    else:
-        # Otherwise, still apply a smaller penalty for having many exams/midterms
-        assessment_penalty -= (midterm_mentions + final_mentions) * 0.05
-    
-    # NEW: Apply penalty for high mentions of difficulty in discussion
-    difficulty_mentions = course_attributes["discussion_topics"]["difficulty"]
-    workload_mentions = course_attributes["discussion_topics"]["workload"]
-    bird_course_mentions = course_attributes["discussion_topics"]["bird_course"]
-    
-    # Bird course mentions positively affect score, but difficulty and workload negatively affect it
-    topic_adjustment = (bird_course_mentions * 0.4) - (difficulty_mentions * 0.25) - (workload_mentions * 0.15)
-    
-    # NEW: Check if failure is commonly mentioned
+    # Check if failure is commonly mentioned
     failure_mentions = sum(count for term, count in course_attributes["sentiment_analysis"]["bird_terms"].items() 
                           if "fail" in term or "failed" in term or "failing" in term)
-    failure_penalty = -0.4 * failure_mentions / max(1, len(threads))
     
-    # NEW: Analyze sentiment patterns in titles more carefully
+    # Analyze sentiment patterns in titles more carefully
     negative_title_sentiment = 0
     for thread in threads:
         if "title" in thread and course_code in thread["title"]:
@@ -446,121 +480,232 @@ def extract_key_course_attributes(threads: List[Dict[str, Any]], analyzer: Senti
             if any(term in title_lower for term in ["fail", "hard", "difficult", "tough", "help", "struggling"]):
                 negative_title_sentiment -= 0.2
     
-    # Calculate final bird score with improved factors
-    course_attributes["bird_score"] = (
-        (course_attributes["sentiment_analysis"]["compound"] * 2.0) +       # Reduced weight of compound sentiment
-        (min(1.2, course_attributes["specific_mentions"] / 5)) +           # Mentions factor
-        (course_attributes["sentiment_analysis"]["pos"] * 1.5) -           # Positive sentiment
-        (course_attributes["sentiment_analysis"]["neg"] * 4.0) +           # Increased weight of negative sentiment
-        (bird_term_score * 1.0) +                                          # Reduced weight of bird terms
-        (min(0.6, avg_score / 50)) +                                       # Reddit score
-        title_bonus +                                                      # Title mentions
-        dept_adjustment +                                                  # Department adjustment
-        comment_factor +                                                   # Comment factor
-        level_adjustment +                                                 # Course level adjustment
-        topic_adjustment +                                                 # NEW: Topic-based adjustment
-        assessment_penalty +                                               # NEW: Assessment penalty
-        failure_penalty +                                                  # NEW: Failure mentions penalty
-        negative_title_sentiment                                           # NEW: Title sentiment penalty
-    )
+    features = {
+        "code": course_code,
+        "department": course_attributes["department"],
+        "compound": course_attributes["sentiment_analysis"]["compound"],
+        "pos": course_attributes["sentiment_analysis"]["pos"],
+        "neg": course_attributes["sentiment_analysis"]["neg"],
+        "specific_mentions": course_attributes["specific_mentions"],
+        "bird_term_sum": bird_term_sum,
+        "thread_count": len(threads),
+        # Course code appears in title
+        "title_mentions": sum(1 for thread in threads if course_code in thread.get("title", "")),
+        "avg_comments": avg_comments,
+        "total_score": sum(thread.get("score", 0) for thread in threads),
+        "exam_difficulty_mentioned": course_attributes["course_components"]["exams"]["difficulty_mentioned"],
+        "midterm_mentions": course_attributes["course_components"]["exams"]["midterm"],
+        "final_mentions": course_attributes["course_components"]["exams"]["final"],
+        "difficulty_mentions": course_attributes["discussion_topics"]["difficulty"],
+        "workload_mentions": course_attributes["discussion_topics"]["workload"],
+        "bird_course_mentions": course_attributes["discussion_topics"]["bird_course"],
+        "failure_mentions": failure_mentions,
+        "negative_title_sentiment": negative_title_sentiment
+    }
+    
+    # Score with the same columnar formula used when re-scoring many courses at once
+    scores = table_rows(detail_scores(build_table([features], DETAIL_COLUMNS), analyzer.department_adjustments))[0]
     
-    # Store additional scores for reference
-    course_attributes["bird_term_score"] = bird_term_score
-    course_attributes["dept_adjustment"] = dept_adjustment
-    course_attributes["comment_factor"] = comment_factor
-    course_attributes["level_adjustment"] = level_adjustment
-    course_attributes["topic_adjustment"] = topic_adjustment               # NEW: Store topic adjustment
-    course_attributes["assessment_penalty"] = assessment_penalty           # NEW: Store assessment penalty
-    course_attributes["failure_penalty"] = failure_penalty                 # NEW: Store failure penalty
-    
-    # Ensure bird score is in a reasonable range (0-10)
-    course_attributes["bird_score"] = max(0, min(10, course_attributes["bird_score"]))
+    # bird_score is already clamped to 0-10; the rest are stored for reference
+    course_attributes.update(scores)
 
     return course_attributes
 
-def analyze_course_specific_threads(api_url: str, course_codes: List[str], output_dir: str, limit: int = 25) -> List[Dict[str, Any]]:
-    """Analyze threads specific to a list of course codes"""
+def analyze_missing(threads: List[Dict[str, Any]], analyzer: SentimentAnalyzer) -> List[Dict[str, Any]]:
+    """The threads in order, analyzing (in one batch) only those without sentiment yet"""
+    pending = [t for t in threads if "sentiment" not in t]
+    analyzed_pending = iter(analyzer.analyze_threads(pending))
+    return [t if "sentiment" in t else next(analyzed_pending) for t in threads]
+
+def build_course_details(course_code: str, threads: List[Dict[str, Any]], analyzer: SentimentAnalyzer, output_dir: str,
+                         compressions: Iterable[str] = ()) -> Dict[str, Any]:
+    """Analyze one course's threads and save its streamlined details; returns None if nothing was found"""
+    # Analyze sentiment of threads that have not been analyzed yet
+    analyzed_threads = analyze_missing(threads, analyzer)
+    
+    # Extract key course attributes
+    course_details = extract_key_course_attributes(analyzed_threads, analyzer)
+    
+    if not course_details:
+        return None
+    
+    # Ensure bird score is properly capped at 10.0
+    course_details['bird_score'] = min(10.0, course_details.get('bird_score', 0))
+    course_details['bird_score'] = round(course_details['bird_score'] * 100) / 100
+    
+    # Create streamlined course details
+    streamlined_details = {
+        "code": course_details['code'],
+        "department": course_details['department'],
+        "bird_score": course_details['bird_score'],
+        "specific_mentions": course_details['specific_mentions'],
+        "is_online_available": course_details.get('is_online_available', False),
+        "difficulty_level": {
+            "easy_mentions": course_details['sentiment_analysis']['bird_terms'].get('easy', 0),
+            "hard_mentions": course_details['sentiment_analysis']['bird_terms'].get('anti:hard', 0) + 
+                           course_details['sentiment_analysis']['bird_terms'].get('anti:difficult', 0),
+            "workload": course_details['discussion_topics'].get('workload', 0)
+        },
+        "course_structure": {
+            "has_finals": course_details['course_components']['exams']['final'] > 0,
+            "has_midterms": course_details['course_components']['exams']['midterm'] > 0,
+            "has_assignments": course_details['course_components']['assignments']['total'] > 0,
+            "has_projects": course_details['course_components']['assessments'].get('projects', 0) > 0,
+        },
+        "threads": [
+            {
+                "title": t['title'],
+                "url": t['url'],
+                "score": t['score'],
+                "created": t.get('created', '')
+            }
+            for t in course_details.get('threads', [])
+        ]
+    }
+    
+    # Save individual course details
+    write_json(streamlined_details, os.path.join(output_dir, f"{course_code}.json"), compressions)
+    
+    return streamlined_details
+
+def analyze_course_specific_threads(api_url: str, course_codes: List[str], output_dir: str, limit: int = 25,
+                                    concurrency: int = 4, timeout: float = 30, batch: bool = True,
+                                    compressions: Iterable[str] = (), profiler: Profiler = None,
+                                    analyzer: SentimentAnalyzer = None, corpus: ThreadCorpus = None,
+                                    local_only: bool = False, client: ServiceClient = None) -> List[Dict[str, Any]]:
+    """Analyze threads specific to a list of course codes.
+    
+    With batch=True all codes go to the service in one streaming request; otherwise up to
+    `concurrency` per-course requests run at once over a shared keep-alive client (one is
+    made with a `timeout` read timeout unless passed in, retrying transient failures). Either
+    way a course is analyzed as soon as its threads arrive, threads shared between courses
+    are analyzed once, and results keep the order of course_codes.
+    
+    An existing analyzer and a corpus of already fetched (and possibly analyzed) threads can
+    be passed in; fetched threads whose text is unchanged reuse the corpus' analysis. Courses
+    are still fetched, since the service also returns threads that only mention a course in
+    the body, which the corpus does not track. With local_only every course is built from
+    the corpus' title matches instead and nothing is fetched (details may then differ)."""
     os.makedirs(output_dir, exist_ok=True)
+    compressions = available_compressions(compressions)
+    profiler = profiler or Profiler()
     
-    # Initialize sentiment analyzer
-    analyzer = SentimentAnalyzer()
+    # Initialize sentiment analyzer unless the caller already has one
+    analyzer = analyzer or SentimentAnalyzer()
+    corpus = corpus if corpus is not None else ThreadCorpus()
     
-    all_course_details = []
-    successful_course_codes = []  # Track successfully analyzed courses
+    course_codes = list(dict.fromkeys(course_codes))
+    details_by_code = {}
     
-    for course_code in course_codes:
-        print(f"Analyzing threads specifically for {course_code}...")
-        
-        # Fetch threads specifically about this course
-        threads = fetch_course_specific_threads(api_url, course_code, limit)
-        
-        if not threads:
-            print(f"No specific threads found for {course_code}, skipping...")
-            continue
-        
-        # Analyze sentiment of threads
-        analyzed_threads = analyzer.analyze_threads(threads)
-        
-        # Extract key course attributes
-        course_details = extract_key_course_attributes(analyzed_threads, analyzer)
-        
-        if course_details:
-            # Ensure bird score is properly capped at 10.0
-            course_details['bird_score'] = min(10.0, course_details.get('bird_score', 0))
-            course_details['bird_score'] = round(course_details['bird_score'] * 100) / 100
-            
-            # Create streamlined course details
-            streamlined_details = {
-                "code": course_details['code'],
-                "department": course_details['department'],
-                "bird_score": course_details['bird_score'],
-                "specific_mentions": course_details['specific_mentions'],
-                "is_online_available": course_details.get('is_online_available', False),
-                "difficulty_level": {
-                    "easy_mentions": course_details['sentiment_analysis']['bird_terms'].get('easy', 0),
-                    "hard_mentions": course_details['sentiment_analysis']['bird_terms'].get('anti:hard', 0) + 
-                                   course_details['sentiment_analysis']['bird_terms'].get('anti:difficult', 0),
-                    "workload": course_details['discussion_topics'].get('workload', 0)
-                },
-                "course_structure": {
-                    "has_finals": course_details['course_components']['exams']['final'] > 0,
-                    "has_midterms": course_details['course_components']['exams']['midterm'] > 0,
-                    "has_assignments": course_details['course_components']['assignments']['total'] > 0,
-                    "has_projects": course_details['course_components']['assessments'].get('projects', 0) > 0,
-                },
-                "threads": [
-                    {
-                        "title": t['title'],
-                        "url": t['url'],
-                        "score": t['score'],
-                        "created": t.get('created', '')
-                    }
-                    for t in course_details.get('threads', [])
-                ]
-            }
+    # Only local_only serves courses from the corpus; otherwise it just saves re-analysis
+    local_codes = course_codes if local_only else []
+    remote_codes = [] if local_only else course_codes
+    if local_codes:
+        print(f"Using {len(local_codes)} courses from the local corpus: {', '.join(local_codes)}")
+    
+    own_client = client is None
+    client = client or ServiceClient(read_timeout=timeout, pool_size=concurrency)
+    try:
+        groups = chain(
+            ((code, corpus.for_course(code, limit)) for code in local_codes),
+            _iter_course_threads(api_url, remote_codes, limit, client, concurrency, batch) if remote_codes else ()
+        )
+        for course_code, threads in groups:
+            if not threads:
+                print(f"No specific threads found for {course_code}, skipping...")
+                continue
             
-            all_course_details.append(streamlined_details)
-            successful_course_codes.append(course_code)  # Add to successful courses list
+            # Analyze each thread once, even when it is shared with another course or stage
+            threads = [corpus.analyzed(t) or t for t in threads]
+            with profiler.section("analyze"):
+                threads = analyze_missing(threads, analyzer)
+            for thread in threads:
+                corpus.add(thread)
             
-            # Save individual course details
-            with open(os.path.join(output_dir, f"{course_code}.json"), 'w') as f:
-                json.dump(streamlined_details, f, indent=2)
+            print(f"Analyzing threads specifically for {course_code}...")
+            with profiler.section("details"):
+                streamlined_details = build_course_details(course_code, threads, analyzer, output_dir, compressions)
+            if streamlined_details:
+                details_by_code[course_code] = streamlined_details
+    finally:
+        if own_client:
+            client.close()
+    
+    all_course_details = [details_by_code[code] for code in course_codes if code in details_by_code]
+    successful_course_codes = list(details_by_code)  # Track successfully analyzed courses
     
     # Save index.json with all successful course codes
-    with open(os.path.join(output_dir, "index.json"), 'w') as f:
-        json.dump(sorted(successful_course_codes), f, indent=2)
+    write_json(sorted(successful_course_codes), os.path.join(output_dir, "index.json"), compressions)
     
     return all_course_details
 
+def _iter_course_threads(api_url: str, course_codes: List[str], limit: int, client: ServiceClient,
+                         concurrency: int, batch: bool) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+    """Yield (course_code, threads) in completion order from the batch or per-course endpoint"""
+    if batch:
+        yield from fetch_course_threads_batch(api_url, course_codes, limit, client)
+        return
+    
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        futures = {
+            pool.submit(fetch_course_specific_threads, api_url, course_code, limit, client): course_code
+            for course_code in course_codes
+        }
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
 def main():
     parser = argparse.ArgumentParser(description='Analyze course-specific Reddit threads')
     parser.add_argument('--api-url', default='http://localhost:3001', help='URL of the Reddit API service')
-    parser.add_argument('--course-codes', required=True, nargs='+', help='List of course codes to analyze')
+    parser.add_argument('--course-codes', nargs='+', help='List of course codes to analyze')
+    parser.add_argument('--top', type=int,
+                        help='Analyze the best N courses from the pipeline rankings instead of --course-codes')
+    parser.add_argument('--rankings-dir', default='processed/rankings',
+                        help='Paged rankings written by the pipeline, read with --top')
     parser.add_argument('--limit', type=int, default=25, help='Maximum number of threads to fetch per course')
     parser.add_argument('--output-dir', default='processed/course_details', help='Directory to save course details')
+    parser.add_argument('--concurrency', type=int, default=4, help='Maximum number of courses fetched at once')
+    parser.add_argument('--timeout', type=float, default=30, help='Seconds to wait for the service to respond')
+    parser.add_argument('--connect-timeout', type=float, default=DEFAULT_CONNECT_TIMEOUT,
+                        help='Seconds to wait for a connection to the service')
+    parser.add_argument('--retries', type=int, default=3,
+                        help='Retries (with jittered exponential backoff) for failed or rate-limited requests')
+    parser.add_argument('--no-batch', action='store_true',
+                        help='Fetch each course with its own request instead of the batch endpoint')
+    parser.add_argument('--compress', nargs='+', choices=list(COMPRESSIONS), default=[],
+                        help='Also write pre-compressed siblings (.gz/.br) of each output file')
+    parser.add_argument('--pretty', action='store_true', help='Indent JSON output for debugging')
+    parser.add_argument('--index-file',
+                        help='Course index written by the pipeline (data/course_index.sqlite); indexed threads are not analyzed again')
+    parser.add_argument('--local-only', action='store_true',
+                        help='Build every course from the course index and never call the Reddit API service')
+    add_profile_arguments(parser, ["analyze", "details"])
     
     args = parser.parse_args()
-    analyze_course_specific_threads(args.api_url, args.course_codes, args.output_dir, args.limit)
+    set_pretty(args.pretty)
+    if args.local_only and not args.index_file:
+        parser.error('--local-only needs --index-file')
+    if not args.course_codes and not args.top:
+        parser.error('give --course-codes or --top')
+    if not args.course_codes:
+        # Only the pages holding the top N courses are read
+        args.course_codes = [course["code"] for course in read_top_courses(args.rankings_dir, args.top)]
+    
+    corpus = None
+    if args.index_file:
+        if not os.path.exists(args.index_file):
+            parser.error(f'no course index at {args.index_file}')
+        with CourseIndex(args.index_file) as course_index:
+            corpus = ThreadCorpus(course_index.iter_threads(args.course_codes), courses=args.course_codes)
+    
+    profiler = Profiler(args.profile, args.output_dir, args.profile_stages, "course_details")
+    with profiler.section("run"), \
+            ServiceClient(args.connect_timeout, args.timeout, args.retries, pool_size=args.concurrency) as client:
+        analyze_course_specific_threads(args.api_url, args.course_codes, args.output_dir, args.limit,
+                                        args.concurrency, args.timeout, not args.no_batch, args.compress, profiler,
+                                        corpus=corpus, local_only=args.local_only, client=client)
+    profiler.save()
+    print_request_stats(client)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,214 @@
+import os
+import json
+import sqlite3
+import argparse
+from typing import List, Dict, Any, Iterable, Iterator, Tuple
+from analysis_cache import content_hash
+from thread_store import parse_created
+
+class CourseIndex:
+    """SQLite-backed inverted index over analyzed threads: course code -> thread ids -> sentences.
+
+    Each posting keeps the offsets (into "title selftext") and sentiment of the sentences
+    analyze_thread scored for that course, so course details and "all mentions of X" can be
+    answered locally without fetching or rescanning the corpus. The threads themselves are
+    not copied: iter_threads reads them from the thread store and their analysis from the
+    analysis cache (by default threads.sqlite and analysis_cache.sqlite next to the index),
+    so scores and comment counts are as fresh as the last fetch. Threads are only re-indexed
+    when their text or the analyzer fingerprint changes; read-only users can leave the
+    fingerprint out.
+    """
+
+    def __init__(self, path: str, fingerprint: str = "", store_file: str = None, cache_file: str = None):
+        self.path = path
+        self.fingerprint = fingerprint
+        directory = os.path.dirname(os.path.abspath(path))
+        self.store_file = store_file or os.path.join(directory, "threads.sqlite")
+        self.cache_file = cache_file or os.path.join(directory, "analysis_cache.sqlite")
+        self.seen = set()  # ids indexed or confirmed current since opening, see prune()
+        self.conn = sqlite3.connect(path)
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(threads)")]
+        if "data" in columns:
+            # Indexes from before threads were read from the thread store held a copy of each one
+            print(f"Rebuilding {path} without its copy of the threads")
+            self.conn.execute("DROP TABLE threads")
+            self.conn.execute("DROP TABLE IF EXISTS postings")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS threads ("
+            " id TEXT PRIMARY KEY,"
+            " content_hash TEXT NOT NULL,"
+            " fingerprint TEXT NOT NULL,"
+            " created_utc REAL)"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS postings ("
+            " course TEXT NOT NULL,"
+            " thread_id TEXT NOT NULL,"
+            " title_mention INTEGER NOT NULL,"
+            " compound REAL NOT NULL,"
+            " sentences TEXT NOT NULL,"
+            " PRIMARY KEY (course, thread_id))"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS postings_thread ON postings (thread_id)")
+        self.conn.commit()
+        self.known = dict(self.conn.execute("SELECT id, content_hash || fingerprint FROM threads"))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.known)
+
+    def close(self) -> None:
+        self.conn.commit()
+        self.conn.close()
+
+    def update(self, thread: Dict[str, Any]) -> bool:
+        """Index one analyzed thread unless it is already indexed unchanged; returns whether it was"""
+        self.seen.add(thread["id"])
+        key = content_hash(thread) + self.fingerprint
+        if self.known.get(thread["id"]) == key:
+            return False
+
+        self.conn.execute("DELETE FROM postings WHERE thread_id = ?", (thread["id"],))
+        self.conn.execute(
+            "INSERT OR REPLACE INTO threads (id, content_hash, fingerprint, created_utc) VALUES (?, ?, ?, ?)",
+            (thread["id"], content_hash(thread), self.fingerprint, parse_created(thread.get("created")))
+        )
+        self.conn.executemany(
+            "INSERT INTO postings (course, thread_id, title_mention, compound, sentences) VALUES (?, ?, ?, ?, ?)",
+            [(code, thread["id"], int(bool(sentiment.get("title_mention"))), sentiment["compound"],
+              json.dumps(sentiment.get("sentences", [])))
+             for code, sentiment in thread.get("courses", {}).items()]
+        )
+        self.known[thread["id"]] = key
+        return True
+
+    def tee(self, threads: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Index threads as they pass through to the next consumer"""
+        for thread in threads:
+            self.update(thread)
+            yield thread
+
+    def prune(self) -> int:
+        """Drop threads not seen since the index was opened; returns how many were dropped"""
+        stale = [thread_id for thread_id in self.known if thread_id not in self.seen]
+        for start in range(0, len(stale), 500):
+            chunk = stale[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            self.conn.execute(f"DELETE FROM postings WHERE thread_id IN ({placeholders})", chunk)
+            self.conn.execute(f"DELETE FROM threads WHERE id IN ({placeholders})", chunk)
+        for thread_id in stale:
+            del self.known[thread_id]
+        self.conn.commit()
+        return len(stale)
+
+    def sync(self, threads: Iterable[Dict[str, Any]]) -> Tuple[int, int]:
+        """Make the index match exactly this corpus; returns (threads re-indexed, threads dropped)"""
+        indexed = sum(self.update(thread) for thread in threads)
+        return indexed, self.prune()
+
+    def courses(self) -> Dict[str, int]:
+        """Thread count per indexed course code"""
+        return dict(self.conn.execute("SELECT course, COUNT(*) FROM postings GROUP BY course ORDER BY course"))
+
+    def lookup(self, course_code: str) -> Dict[str, Dict[str, Any]]:
+        """Postings for a course: thread id -> {"title_mention", "compound", "sentences"}.
+
+        sentences are [start, end, compound, names the course] lists."""
+        rows = self.conn.execute(
+            "SELECT thread_id, title_mention, compound, sentences FROM postings WHERE course = ?", (course_code,)
+        )
+        return {
+            thread_id: {"title_mention": bool(title_mention), "compound": compound, "sentences": json.loads(sentences)}
+            for thread_id, title_mention, compound, sentences in rows
+        }
+
+    def _attach(self) -> None:
+        """Attach the thread store and analysis cache the indexed threads are read from"""
+        attached = {row[1] for row in self.conn.execute("PRAGMA database_list")}
+        for name, path in (("store", self.store_file), ("cache", self.cache_file)):
+            if name in attached:
+                continue
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"{path} not found; the course index reads its threads from it")
+            self.conn.execute("ATTACH DATABASE ? AS " + name, (path,))
+
+    def iter_threads(self, course_codes: Iterable[str], title_only: bool = False) -> Iterator[Dict[str, Any]]:
+        """Analyzed threads mentioning any of the courses (in the title, with title_only), newest first.
+
+        Threads come from the thread store with their cached analysis attached; a thread whose
+        analysis is no longer cached for the text and analyzer it was indexed with is yielded
+        without one."""
+        course_codes = list(course_codes)
+        if not course_codes:
+            return
+        self._attach()
+        rows = self.conn.execute(
+            "SELECT s.data, t.content_hash, t.fingerprint, a.content_hash, a.fingerprint, a.result"
+            " FROM threads t"
+            " JOIN store.threads s ON s.id = t.id"
+            " LEFT JOIN cache.analyses a ON a.thread_id = t.id"
+            " WHERE t.id IN ("
+            f" SELECT thread_id FROM postings WHERE course IN ({','.join('?' * len(course_codes))})"
+            f"{' AND title_mention = 1' if title_only else ''})"
+            " ORDER BY t.created_utc DESC",
+            course_codes
+        )
+        for data, indexed_hash, indexed_fingerprint, cached_hash, cached_fingerprint, result in rows:
+            thread = json.loads(data)
+            if result is not None and cached_hash == indexed_hash == content_hash(thread) \
+                    and cached_fingerprint == indexed_fingerprint:
+                thread.update(json.loads(result))
+            yield thread
+
+    def mentions(self, course_code: str, direct_only: bool = True) -> List[Dict[str, Any]]:
+        """Every indexed sentence about a course with its thread, text and sentiment, newest thread first.
+
+        With direct_only=False the neighbouring context sentences are included too."""
+        postings = self.lookup(course_code)
+        results = []
+        for thread in self.iter_threads([course_code]):
+            if "courses" not in thread:
+                continue  # Edited or re-analyzed since it was indexed; its offsets no longer apply
+            text = f"{thread['title']} {thread['selftext']}"
+            for start, end, compound, direct in postings[thread["id"]]["sentences"]:
+                if direct or not direct_only:
+                    results.append({
+                        "thread_id": thread["id"],
+                        "title": thread["title"],
+                        "url": thread["url"],
+                        "created": thread.get("created"),
+                        "start": start,
+                        "end": end,
+                        "text": text[start:end],
+                        "sentiment": compound
+                    })
+        return results
+
+def main():
+    parser = argparse.ArgumentParser(description='Look up what has been said about a course in the local course index')
+    parser.add_argument('course_code', nargs='?', help='Course code to look up; lists indexed courses if omitted')
+    parser.add_argument('--index-file', default='data/course_index.sqlite', help='Course index written by the pipeline')
+    parser.add_argument('--context', action='store_true', help='Include the sentences around each mention')
+
+    args = parser.parse_args()
+    if not os.path.exists(args.index_file):
+        print(f"No course index at {args.index_file}; run the pipeline first")
+        return
+    with CourseIndex(args.index_file) as index:
+        if not args.course_code:
+            for code, thread_count in index.courses().items():
+                print(f"{code}: {thread_count} threads")
+            return
+
+        mentions = index.mentions(args.course_code.upper(), direct_only=not args.context)
+        for mention in mentions:
+            print(f"[{mention['sentiment']:+.2f}] {mention['text']}  ({mention['title']}, {mention['url']})")
+        print(f"{len(mentions)} sentences in {len({m['thread_id'] for m in mentions})} threads")
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,57 @@
 import os
 import sys
-import json
 import requests
 import argparse
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator
 import datetime
+from thread_store import ThreadStore
+from http_client import DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT, ServiceClient
+from json_output import save_to_json, set_pretty
 
-def fetch_bird_course_threads(api_url: str, limit: int = 50, time_period: str = 'year') -> List[Dict[str, Any]]:
-    """Fetch bird course threads from the Reddit API service"""
+def fetch_bird_course_threads(api_url: str, limit: int = 50, time_period: str = 'year',
+                              store: ThreadStore = None, full_refresh: bool = False,
+                              client: ServiceClient = None) -> List[Dict[str, Any]]:
+    """Fetch bird course threads from the Reddit API service.
+    
+    With a store, only threads newer than its high-water mark for time_period are requested
+    (unless full_refresh is set; the service pages back until it reaches the mark); they are
+    merged in and the stored threads for time_period are returned. Transient failures are
+    retried by the client; if the request still fails nothing new is fetched and the mark stays."""
+    since = None
+    if store is not None and not full_refresh:
+        since = store.high_water_mark(time_period)
+    
+    own_client = client is None
+    client = client or ServiceClient()
     try:
         url = f"{api_url}/api/bird-courses?limit={limit}&timePeriod={time_period}"
+        if since is not None:
+            url += f"&since={int(since)}"
         print(f"Fetching data from: {url}")
-        response = requests.get(url)
-        response.raise_for_status()
-        return response.json()
-    except Exception as e:
+        threads = client.get_json(url, endpoint="/api/bird-courses")
+        fetched = True
+    except (requests.exceptions.RequestException, ValueError) as e:
         print(f"Error fetching bird course threads: {e}")
-        return []
+        threads = []
+        fetched = False
+    finally:
+        if own_client:
+            client.close()
+    
+    if store is None:
+        return threads
+    
+    inserted, updated = store.merge(threads)
+    if fetched:
+        store.advance_high_water_mark(time_period, threads)
+    print(f"Thread store: {inserted} new, {updated} updated, {len(store)} stored")
+    return store.load(time_period)
 
-def save_to_json(data: Any, file_path: str) -> None:
-    """Save data to a JSON file"""
-    try:
-        with open(file_path, 'w') as f:
-            json.dump(data, f, indent=2)
-        print(f"Data saved to {file_path}")
-    except Exception as e:
-        print(f"Error saving data to {file_path}: {e}")
+def sync_thread_store(api_url: str, store: ThreadStore, limit: int = 50, time_period: str = 'year',
+                      full_refresh: bool = False, client: ServiceClient = None) -> Iterator[Dict[str, Any]]:
+    """Like fetch_bird_course_threads with a store, but stream the stored threads instead of listing them"""
+    fetch_bird_course_threads(api_url, limit, time_period, store, full_refresh, client)
+    return store.iter_threads(time_period)
 
 def main():
     parser = argparse.ArgumentParser(description='Fetch bird course threads from Reddit API')
@@ -34,14 +60,23 @@ def main():
     parser.add_argument('--time-period', choices=['hour', 'day', 'week', 'month', 'year', 'all'], 
                         default='year', help='Time period to search')
     parser.add_argument('--output-dir', '-o', default='data', help='Directory to save fetched data')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_READ_TIMEOUT,
+                        help='Seconds to wait for the service to respond')
+    parser.add_argument('--connect-timeout', type=float, default=DEFAULT_CONNECT_TIMEOUT,
+                        help='Seconds to wait for a connection to the service')
+    parser.add_argument('--retries', type=int, default=3,
+                        help='Retries (with jittered exponential backoff) for failed or rate-limited requests')
+    parser.add_argument('--pretty', action='store_true', help='Indent JSON output for debugging')
     
     args = parser.parse_args()
+    set_pretty(args.pretty)
     
     # Ensure output directory exists
     os.makedirs(args.output_dir, exist_ok=True)
     
     print(f"Fetching up to {args.limit} bird course threads from the past {args.time_period}...")
-    threads = fetch_bird_course_threads(args.api_url, args.limit, args.time_period)
+    with ServiceClient(args.connect_timeout, args.timeout, args.retries) as client:
+        threads = fetch_bird_course_threads(args.api_url, args.limit, args.time_period, client=client)
     
     if not threads:
         print("No threads fetched")
@@ -0,0 +1,114 @@
+import time
+import random
+import requests
+import numpy as np
+from typing import Dict, Any, Optional
+
+# Responses worth another try: rate limiting and transient server/proxy failures
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+DEFAULT_CONNECT_TIMEOUT = 5
+DEFAULT_READ_TIMEOUT = 60
+
+class ServiceClient:
+    """Shared HTTP client for the Reddit API service.
+
+    One pooled keep-alive session with separate connect/read timeouts. Connection errors,
+    timeouts and RETRY_STATUSES responses are retried with full-jitter exponential backoff
+    (a random delay of up to backoff * 2 ** attempt, capped at max_backoff, or the server's
+    Retry-After if that is longer). Every call's latency, retries and failures are recorded
+    per endpoint for stats(). Safe to share between threads.
+    """
+
+    def __init__(self, connect_timeout: float = DEFAULT_CONNECT_TIMEOUT, read_timeout: float = DEFAULT_READ_TIMEOUT,
+                 retries: int = 3, backoff: float = 0.5, max_backoff: float = 10, pool_size: int = 4):
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=max(1, pool_size))
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.calls = {}  # endpoint -> {"latencies", "retries", "errors"}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self) -> None:
+        self.session.close()
+
+    def request(self, method: str, url: str, endpoint: str = None, **kwargs) -> requests.Response:
+        """Send a request, retrying transient failures; raises requests.RequestException once retries run out.
+
+        endpoint names the call in stats() (defaults to the URL without its query string)."""
+        endpoint = endpoint or url.split("?")[0]
+        kwargs.setdefault("timeout", self.timeout)
+        calls = self.calls.setdefault(endpoint, {"latencies": [], "retries": 0, "errors": 0})
+
+        for attempt in range(self.retries + 1):
+            start = time.perf_counter()
+            retry_after = None
+            try:
+                response = self.session.request(method, url, **kwargs)
+                if response.status_code not in RETRY_STATUSES or attempt == self.retries:
+                    calls["latencies"].append(time.perf_counter() - start)
+                    response.raise_for_status()
+                    return response
+                retry_after = response.headers.get("Retry-After")
+                error = f"HTTP {response.status_code}"
+                response.close()
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if attempt == self.retries:
+                    calls["latencies"].append(time.perf_counter() - start)
+                    calls["errors"] += 1
+                    raise
+                error = type(e).__name__
+            except requests.exceptions.RequestException:
+                calls["errors"] += 1
+                raise
+
+            delay = self.retry_delay(attempt, retry_after)
+            calls["retries"] += 1
+            print(f"{method} {endpoint} failed ({error}), retrying in {delay:.1f}s "
+                  f"({attempt + 1}/{self.retries})")
+            time.sleep(delay)
+
+    def retry_delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, min(self.max_backoff, float(retry_after)))
+        return delay
+
+    def get(self, url: str, endpoint: str = None, **kwargs) -> requests.Response:
+        return self.request("GET", url, endpoint, **kwargs)
+
+    def post(self, url: str, endpoint: str = None, **kwargs) -> requests.Response:
+        return self.request("POST", url, endpoint, **kwargs)
+
+    def get_json(self, url: str, endpoint: str = None, **kwargs) -> Any:
+        return self.get(url, endpoint, **kwargs).json()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-endpoint call counts, retries, failures and latency percentiles in milliseconds"""
+        stats = {}
+        for endpoint, calls in self.calls.items():
+            latencies_ms = np.array(calls["latencies"]) * 1000
+            stats[endpoint] = {
+                "calls": len(latencies_ms),
+                "retries": calls["retries"],
+                "errors": calls["errors"],
+                "p50_ms": round(float(np.percentile(latencies_ms, 50)), 3) if latencies_ms.size else None,
+                "p95_ms": round(float(np.percentile(latencies_ms, 95)), 3) if latencies_ms.size else None,
+                "max_ms": round(float(np.max(latencies_ms)), 3) if latencies_ms.size else None
+            }
+        return stats
+
+def print_request_stats(client: ServiceClient) -> None:
+    for endpoint, stats in client.stats().items():
+        latency = f"p50 {stats['p50_ms']:.0f}ms, p95 {stats['p95_ms']:.0f}ms, max {stats['max_ms']:.0f}ms" \
+            if stats["calls"] else "no responses"
+        print(f"{endpoint}: {stats['calls']} calls, {stats['retries']} retries, {stats['errors']} failed ({latency})")
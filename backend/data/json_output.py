@@ -0,0 +1,97 @@
+import os
+import json
+import gzip
+import uuid
+from typing import Any, Iterable, List, Tuple
+
+# orjson and brotli are optional; without them output falls back to the stdlib
+# encoder and brotli siblings are skipped.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIONS = {"gzip": ".gz", "brotli": ".br"}
+
+# Output is compact unless pretty-printing is turned on for debugging
+_pretty = False
+
+def set_pretty(pretty: bool) -> None:
+    """Indent every JSON file written from now on (debug mode)"""
+    global _pretty
+    _pretty = pretty
+
+def encode_json(data: Any, pretty: bool = None) -> bytes:
+    """Serialize data to UTF-8 JSON, compact unless pretty (or debug mode) is set"""
+    if pretty is None:
+        pretty = _pretty
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, option=orjson.OPT_INDENT_2 if pretty else 0)
+        except TypeError:
+            pass  # Types orjson rejects (e.g. non-string keys) go through the stdlib encoder
+    if pretty:
+        return json.dumps(data, indent=2).encode("utf-8")
+    return json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+def available_compressions(methods: Iterable[str]) -> List[str]:
+    """The requested compression methods whose libraries are installed"""
+    methods = list(dict.fromkeys(methods))
+    if "brotli" in methods and brotli is None:
+        print("brotli is not installed, skipping .br output")
+        methods.remove("brotli")
+    return methods
+
+def compress(data: bytes, method: str) -> bytes:
+    if method == "gzip":
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    return brotli.compress(data, quality=11)
+
+def create_temp_file(file_path: str) -> Tuple[int, str]:
+    """Open a new temp file next to file_path; returns (fd, temp path).
+
+    It is created with mode 0o666 so the kernel applies the umask, giving the published
+    file the same permissions as one written directly (mkstemp would make it owner-only)."""
+    directory = os.path.dirname(os.path.abspath(file_path))
+    while True:
+        temp_path = os.path.join(directory, f".{os.path.basename(file_path)}.{uuid.uuid4().hex[:12]}.tmp")
+        try:
+            flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)  # O_BINARY: Windows only
+            return os.open(temp_path, flags, 0o666), temp_path
+        except FileExistsError:
+            continue
+
+def publish_temp_file(temp_path: str, file_path: str) -> None:
+    """Rename a finished temp file over file_path"""
+    os.replace(temp_path, file_path)
+
+def write_atomic(data: bytes, file_path: str) -> None:
+    """Write via a temp file in the same directory and rename it over file_path"""
+    fd, temp_path = create_temp_file(file_path)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        publish_temp_file(temp_path, file_path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+def write_json(data: Any, file_path: str, compressions: Iterable[str] = ()) -> None:
+    """Atomically write data as JSON, plus a pre-compressed sibling (.gz/.br) per requested method"""
+    encoded = encode_json(data)
+    write_atomic(encoded, file_path)
+    for method in compressions:
+        write_atomic(compress(encoded, method), file_path + COMPRESSIONS[method])
+
+def save_to_json(data: Any, file_path: str, compressions: Iterable[str] = ()) -> None:
+    """Save data to a JSON file"""
+    try:
+        write_json(data, file_path, compressions)
+        print(f"Data saved to {file_path}")
+    except Exception as e:
+        print(f"Error saving data to {file_path}: {e}")
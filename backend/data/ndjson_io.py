@@ -0,0 +1,63 @@
+import os
+import json
+from typing import Any, Dict, Iterable, Iterator
+from json_output import create_temp_file, encode_json, publish_temp_file
+
+# Newline-delimited JSON lets the thread stages stream one record at a time
+# instead of holding whole corpora (raw, analyzed, rankings) in memory.
+
+def iter_ndjson(file_path: str) -> Iterator[Dict[str, Any]]:
+    """Yield one record per non-empty line of an NDJSON file"""
+    with open(file_path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+class NDJSONWriter:
+    """Append records to an NDJSON file one line at a time.
+    
+    Lines go to a temp file that replaces file_path on a clean close, so readers never
+    see a half-written file; if writing fails the previous file is left untouched."""
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.count = 0
+        fd, self._temp_path = create_temp_file(file_path)
+        self._file = os.fdopen(fd, 'wb')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+    def write(self, record: Any) -> None:
+        self._file.write(encode_json(record, pretty=False))
+        self._file.write(b'\n')
+        self.count += 1
+
+    def close(self) -> None:
+        self._file.close()
+        publish_temp_file(self._temp_path, self.file_path)
+
+    def discard(self) -> None:
+        self._file.close()
+        os.unlink(self._temp_path)
+
+def write_ndjson(records: Iterable[Any], file_path: str) -> int:
+    """Write every record of an iterable to an NDJSON file; returns the number written"""
+    with NDJSONWriter(file_path) as writer:
+        for record in records:
+            writer.write(record)
+    print(f"Data saved to {file_path}")
+    return writer.count
+
+def tee_ndjson(records: Iterable[Any], writer: NDJSONWriter) -> Iterator[Any]:
+    """Pass records through unchanged while also writing each one"""
+    for record in records:
+        writer.write(record)
+        yield record
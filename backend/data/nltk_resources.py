@@ -0,0 +1,58 @@
+import argparse
+from typing import List
+
+# NLTK data used by the analyzers, mapped to the path nltk.data.find looks for.
+# punkt/punkt_tab are optional: sentence splitting falls back to punctuation without them.
+REQUIRED_RESOURCES = {
+    'vader_lexicon': 'sentiment/vader_lexicon.zip',
+    'stopwords': 'corpora/stopwords',
+}
+
+OPTIONAL_RESOURCES = {
+    'punkt': 'tokenizers/punkt',
+    'punkt_tab': 'tokenizers/punkt_tab',
+}
+
+def _is_installed(path: str) -> bool:
+    import nltk
+    try:
+        nltk.data.find(path)
+        return True
+    except LookupError:
+        return False
+
+def missing_nltk_resources(include_optional: bool = False) -> List[str]:
+    """Names of NLTK resources that are not available locally"""
+    resources = dict(REQUIRED_RESOURCES)
+    if include_optional:
+        resources.update(OPTIONAL_RESOURCES)
+    return [name for name, path in resources.items() if not _is_installed(path)]
+
+def ensure_nltk_resources() -> None:
+    """Check the local NLTK data without touching the network"""
+    missing = missing_nltk_resources()
+    if missing:
+        raise LookupError(
+            f"Missing NLTK data: {', '.join(missing)}. "
+            "Run `python pipeline.py --download-nltk-data` once to install it."
+        )
+
+def download_nltk_data(quiet: bool = False) -> bool:
+    """Download every resource the analyzers use; returns True if all required ones are present"""
+    import nltk
+    for name in list(REQUIRED_RESOURCES) + list(OPTIONAL_RESOURCES):
+        nltk.download(name, quiet=quiet)
+    missing = missing_nltk_resources()
+    if missing:
+        print(f"Still missing NLTK data after download: {', '.join(missing)}")
+        return False
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description='Download the NLTK data used by BirdWatch')
+    parser.add_argument('--quiet', action='store_true', help='Suppress NLTK download progress')
+    args = parser.parse_args()
+    download_nltk_data(args.quiet)
+
+if __name__ == "__main__":
+    main()
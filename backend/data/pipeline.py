@@ -1,20 +1,27 @@
 import os
 import sys
+import json
 import argparse
 import datetime
-from fetch_reddit_data import fetch_bird_course_threads
+from fetch_reddit_data import fetch_bird_course_threads, sync_thread_store
+from thread_store import ThreadStore
+from course_aggregates import CourseAggregates, WINDOWS
+from analysis_cache import AnalysisCache
+from course_index import CourseIndex
 from sentiment_analyzer import SentimentAnalyzer
 from course_details_analyzer import analyze_course_specific_threads
-import json
+from nltk_resources import download_nltk_data
+from ndjson_io import NDJSONWriter, iter_ndjson, tee_ndjson
+from thread_corpus import ThreadCorpus
+from ranking_pages import PAGE_SIZE, write_ranking_pages
+from json_output import COMPRESSIONS, available_compressions, save_to_json, set_pretty
+from run_metrics import RunMetrics
+from http_client import DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT, ServiceClient, print_request_stats
+from profiling import Profiler, add_profile_arguments
 
-def save_to_json(data, file_path):
-    """Save data to a JSON file"""
-    try:
-        with open(file_path, 'w') as f:
-            json.dump(data, f, indent=2)
-        print(f"Data saved to {file_path}")
-    except Exception as e:
-        print(f"Error saving data to {file_path}: {e}")
+# Stage names in the run report, also accepted by --profile-stages
+PIPELINE_STAGES = ["setup", "fetch", "analyze", "analyze_stream", "index", "aggregate", "rankings", "windows",
+                   "course_details", "write_json"]
 
 def load_json_file(file_path):
     """Load data from a JSON file"""
@@ -25,8 +32,100 @@ def load_json_file(file_path):
         print(f"Error loading data from {file_path}: {e}")
         return None
 
-def run_pipeline(api_url, limit, time_period, data_dir, processed_dir, analyze_top_courses=True, top_courses_count=10):
-    """Run the full data pipeline"""
+def analyze_and_aggregate(api_url, limit, time_period, data_dir, aggregates, analyzer, metrics, workers=1,
+                          full_refresh=False, output_format='json', client=None):
+    """Fetch, analyze and fold threads into the aggregates and the course index.
+    
+    Returns (thread count, touched courses, analysis cache, analyzed threads); the analyzed
+    threads are None in ndjson mode, where they are only written to latest_threads.ndjson."""
+    store_file = os.path.join(data_dir, "threads.sqlite")
+    analysis_cache_file = os.path.join(data_dir, "analysis_cache.sqlite")
+    course_index_file = os.path.join(data_dir, "course_index.sqlite")
+    
+    if output_format == 'ndjson':
+        # Stream threads from the store through analysis into the aggregates one at a time,
+        # writing the raw and analyzed copies as NDJSON on the way
+        with ThreadStore(store_file) as store, \
+                AnalysisCache(analysis_cache_file, analyzer.analysis_fingerprint()) as analysis_cache, \
+                CourseIndex(course_index_file, analyzer.analysis_fingerprint()) as course_index, \
+                NDJSONWriter(os.path.join(data_dir, "latest_raw_threads.ndjson")) as raw_writer, \
+                NDJSONWriter(os.path.join(data_dir, "latest_threads.ndjson")) as analyzed_writer:
+            with metrics.stage("fetch"):
+                stored_threads = sync_thread_store(api_url, store, limit, time_period, full_refresh, client)
+            
+            # Reading, analysis, writes and aggregation interleave, so they are timed as one stage
+            print("Analyzing threads...")
+            with metrics.stage("analyze_stream"):
+                threads = tee_ndjson(stored_threads, raw_writer)
+                analyzed_threads = analyzer.iter_analyze_threads(threads, workers=workers, cache=analysis_cache)
+                touched_courses = aggregates.sync(course_index.tee(tee_ndjson(analyzed_threads, analyzed_writer)),
+                                                  analyzer.analysis_fingerprint())
+                course_index.prune()
+        print(f"Data saved to {raw_writer.file_path}")
+        print(f"Data saved to {analyzed_writer.file_path}")
+        return raw_writer.count, touched_courses, analysis_cache, None
+    
+    # Threads are kept between runs so only new ones have to be fetched
+    with metrics.stage("fetch"), ThreadStore(store_file) as store:
+        threads = fetch_bird_course_threads(api_url, limit, time_period, store, full_refresh, client)
+    if not threads:
+        return 0, set(), None, None
+    
+    # Save raw data to a single file
+    with metrics.stage("write_json"):
+        save_to_json(threads, os.path.join(data_dir, "latest_raw_threads.json"))
+    
+    # Analyze threads, reusing cached results for threads whose text has not changed
+    print(f"Analyzing {len(threads)} threads...")
+    with metrics.stage("analyze"), \
+            AnalysisCache(analysis_cache_file, analyzer.analysis_fingerprint()) as analysis_cache:
+        analyzed_threads = analyzer.analyze_threads(threads, workers=workers, cache=analysis_cache)
+    
+    # Save analyzed threads to a single file
+    with metrics.stage("write_json"):
+        save_to_json(analyzed_threads, os.path.join(data_dir, "latest_threads.json"))
+    
+    # Index course mentions so later stages can look courses up without rescanning
+    with metrics.stage("index"), CourseIndex(course_index_file, analyzer.analysis_fingerprint()) as course_index:
+        indexed, dropped = course_index.sync(analyzed_threads)
+    print(f"Course index: {indexed} threads indexed, {dropped} dropped, {len(course_index)} total")
+    
+    # Fold only new, edited or removed threads into the saved aggregates
+    with metrics.stage("aggregate"):
+        touched_courses = aggregates.sync(analyzed_threads, analyzer.analysis_fingerprint())
+    return len(threads), touched_courses, analysis_cache, analyzed_threads
+
+def normalize_bird_scores(course_rankings):
+    """Cap bird scores at 10 and round them to two decimals, in place (this keeps the order)"""
+    for course in course_rankings:
+        course['bird_score'] = min(10.0, course.get('bird_score', 0))
+        course['bird_score'] = round(course['bird_score'] * 100) / 100
+
+def record_run_counters(metrics, analyzer, analysis_cache, thread_count, touched_courses, course_count):
+    """Copy work counts and cache hit rates into the run metrics"""
+    metrics.set("threads", thread_count)
+    metrics.set("courses", course_count)
+    metrics.set("courses_touched", len(touched_courses))
+    for name in ("threads_analyzed", "sentences", "vader_calls", "lexicon_hits"):
+        metrics.set(name, analyzer.counters[name])
+    for prefix, stats in (("analysis_cache", analysis_cache.stats()), ("vader_cache", analyzer.score_cache_stats())):
+        metrics.set(f"{prefix}_hits", stats["hits"])
+        metrics.set(f"{prefix}_misses", stats["misses"])
+        metrics.set(f"{prefix}_hit_rate", round(stats["hit_rate"], 4))
+
+def run_pipeline(api_url, limit, time_period, data_dir, processed_dir, analyze_top_courses=True, top_courses_count=10, workers=1,
+                 full_refresh=False, output_format='json', compressions=(), report_file=None, prometheus_file=None,
+                 profiler=None, page_size=PAGE_SIZE, rankings_limit=None, windows=(), half_life_days=None, client=None):
+    """Run the full data pipeline.
+    
+    Rankings are written as pages of page_size courses under processed_dir/rankings; with
+    rankings_limit only that many of the best courses are selected and written. Each of
+    windows (week, month, year, all) gets its own rankings under processed_dir/rankings_<window>,
+    all computed in one pass over the analyzed threads, optionally time-decayed.
+    All calls to the Reddit API service go through client (a default ServiceClient if not
+    given), whose per-endpoint latencies and retries end up in the run report.
+    Stage timings and counters are written to report_file (default processed_dir/run_report.json)
+    and, if prometheus_file is given, in Prometheus text format."""
     # Ensure directories exist
     os.makedirs(data_dir, exist_ok=True)
     os.makedirs(processed_dir, exist_ok=True)
@@ -35,37 +134,64 @@ def run_pipeline(api_url, limit, time_period, data_dir, processed_dir, analyze_t
     course_details_dir = os.path.join(processed_dir, "course_details")
     os.makedirs(course_details_dir, exist_ok=True)
     
-    # 1. Fetch data from Reddit API
+    compressions = available_compressions(compressions)
+    metrics = RunMetrics(profiler=profiler)
+    client = client or ServiceClient()
+    report_file = report_file or os.path.join(processed_dir, "run_report.json")
+    
+    # 1. Initialize sentiment analyzer and load the course aggregates saved by the last run
+    with metrics.stage("setup"):
+        analyzer = SentimentAnalyzer()
+        aggregates_file = os.path.join(processed_dir, "course_aggregates.json")
+        aggregates = CourseAggregates.load(aggregates_file)
+    
+    # 2-5. Fetch, save raw, analyze and save analyzed threads, folding them into the aggregates
     print(f"Fetching up to {limit} bird course threads from the past {time_period}...")
-    threads = fetch_bird_course_threads(api_url, limit, time_period)
+    thread_count, touched_courses, analysis_cache, analyzed_threads = analyze_and_aggregate(
+        api_url, limit, time_period, data_dir, aggregates, analyzer, metrics, workers, full_refresh, output_format,
+        client
+    )
     
-    if not threads:
+    if not thread_count:
         print("No threads fetched. Make sure the Reddit API server is running.")
         print(f"Check that the API server is running at {api_url}")
+        metrics.set("threads", 0)
+        metrics.set_requests(client.stats())
+        metrics.save(report_file, prometheus_file)
         return
     
-    # 2. Save raw data to a single file
-    raw_data_file = os.path.join(data_dir, "latest_raw_threads.json")
-    save_to_json(threads, raw_data_file)
-    
-    # 3. Initialize sentiment analyzer
-    analyzer = SentimentAnalyzer()
+    # 6. Generate course rankings, re-scoring only the courses touched above
+    print("Generating course rankings...")
+    with metrics.stage("rankings"):
+        course_rankings = aggregates.rankings(analyzer, rankings_limit)
+        aggregates.save(aggregates_file)
+    print(f"Updated {len(touched_courses)} of {len(aggregates.courses)} course aggregates")
     
-    # 4. Analyze threads
-    print(f"Analyzing {len(threads)} threads...")
-    analyzed_threads = analyzer.analyze_threads(threads)
+    # Department and level rollups are maintained alongside the rankings
+    with metrics.stage("write_json"):
+        save_to_json(aggregates.rollups(), os.path.join(processed_dir, "latest_course_rollups.json"))
     
-    # 5. Save analyzed threads to a single file
-    save_to_json(analyzed_threads, os.path.join(data_dir, "latest_threads.json"))
+    # 7. Normalize bird scores to ensure they're on a 0-10 scale
+    normalize_bird_scores(course_rankings)
     
-    # 6. Generate course rankings
-    print("Generating course rankings...")
-    course_rankings = analyzer.get_course_rankings(analyzed_threads)
+    # Capping and rounding keep the order, so the rankings are still sorted
+    with metrics.stage("write_json"):
+        write_ranking_pages(course_rankings, os.path.join(processed_dir, "rankings"), page_size, compressions)
     
-    # 7. Normalize bird scores to ensure they're on a 0-10 scale
-    for course in course_rankings:
-        course['bird_score'] = min(10.0, course.get('bird_score', 0))
-        course['bird_score'] = round(course['bird_score'] * 100) / 100
+    # Trailing-window leaderboards from the threads already analyzed above
+    if windows:
+        print(f"Generating {', '.join(windows)} rankings...")
+        with metrics.stage("windows"):
+            threads = analyzed_threads
+            if threads is None:
+                threads = iter_ndjson(os.path.join(data_dir, "latest_threads.ndjson"))
+            windowed_rankings = analyzer.get_windowed_rankings(threads, windows, half_life_days=half_life_days,
+                                                               top=rankings_limit)
+        for window, window_rankings in windowed_rankings.items():
+            normalize_bird_scores(window_rankings)
+            with metrics.stage("write_json"):
+                write_ranking_pages(window_rankings, os.path.join(processed_dir, f"rankings_{window}"), page_size,
+                                    compressions)
     
     # 8. If enabled, analyze top courses in more detail
     if analyze_top_courses and course_rankings:
@@ -75,22 +201,45 @@ def run_pipeline(api_url, limit, time_period, data_dir, processed_dir, analyze_t
         top_courses = [course['code'] for course in course_rankings[:top_courses_count]]
         print(f"Top courses selected for detailed analysis: {', '.join(top_courses)}")
         
-        # Run detailed analysis
-        course_details = analyze_course_specific_threads(api_url, top_courses, course_details_dir)
+        # Run detailed analysis with this run's analyzer and threads, so already analyzed
+        # threads are not analyzed again
+        with metrics.stage("course_details"):
+            if analyzed_threads is None:
+                # In ndjson mode the threads are not in memory; the index serves just the top courses' threads
+                with CourseIndex(os.path.join(data_dir, "course_index.sqlite"), analyzer.analysis_fingerprint()) as course_index:
+                    analyzed_threads = list(course_index.iter_threads(top_courses))
+            corpus = ThreadCorpus(analyzed_threads, courses=top_courses)
+            course_details = analyze_course_specific_threads(api_url, top_courses, course_details_dir,
+                                                             compressions=compressions, analyzer=analyzer,
+                                                             corpus=corpus, client=client)
+        metrics.set("detailed_courses", len(course_details))
         
         if course_details:
             print(f"Detailed analysis completed for {len(course_details)} courses.")
-            save_to_json(course_details, os.path.join(processed_dir, "latest_course_details.json"))
+            with metrics.stage("write_json"):
+                save_to_json(course_details, os.path.join(processed_dir, "latest_course_details.json"))
     
     # 9. Print summary
     print(f"\nPipeline completed successfully.")
-    print(f"Processed {len(threads)} threads and identified {len(course_rankings)} courses")
+    print(f"Processed {thread_count} threads and identified {len(aggregates.courses)} courses")
+    analysis_stats = analysis_cache.stats()
+    print(f"Analysis cache: {analysis_stats['hits']} hits, {analysis_stats['misses']} misses "
+          f"({analysis_stats['hit_rate']:.1%} hit rate)")
+    cache_stats = analyzer.score_cache_stats()
+    print(f"VADER score cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+          f"({cache_stats['hit_rate']:.1%} hit rate)")
     
-    # Sort the course rankings by bird_score before displaying
-    sorted_rankings = sorted(course_rankings, key=lambda x: x['bird_score'], reverse=True)
+    record_run_counters(metrics, analyzer, analysis_cache, thread_count, touched_courses, len(aggregates.courses))
+    metrics.set_requests(client.stats())
+    metrics.save(report_file, prometheus_file)
+    print("Stage timings:")
+    for name, stage in metrics.report()["stages"].items():
+        print(f"  {name}: {stage['wall_seconds']:.2f}s wall, {stage['cpu_seconds']:.2f}s CPU")
+    print("Reddit API requests:")
+    print_request_stats(client)
     
     print(f"\nTop 5 bird courses:")
-    for i, course in enumerate(sorted_rankings[:5], 1):
+    for i, course in enumerate(course_rankings[:5], 1):
         print(f"{i}. {course['code']} - Bird Score: {course['bird_score']:.2f}/10 - Mentions: {course['mentions']}")
 
 def main():
@@ -107,8 +256,43 @@ def main():
                         help='Number of top courses to analyze in detail')
     parser.add_argument('--no-prompt', action='store_true', 
                         help='Run without prompting for time period')
+    parser.add_argument('--full-refresh', action='store_true',
+                        help='Refetch the whole search window instead of only threads newer than the local store')
+    parser.add_argument('--download-nltk-data', action='store_true',
+                        help='Download the NLTK data used for analysis and exit')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Worker processes for thread analysis (0 = all CPU cores)')
+    parser.add_argument('--format', choices=['json', 'ndjson'], default='json',
+                        help='ndjson streams threads through analysis one at a time and writes NDJSON thread files')
+    parser.add_argument('--compress', nargs='+', choices=list(COMPRESSIONS), default=[],
+                        help='Also write pre-compressed siblings of the course detail and ranking page files')
+    parser.add_argument('--page-size', type=int, default=PAGE_SIZE,
+                        help='Courses per rankings page file (processed/rankings/page_NNNN.json)')
+    parser.add_argument('--rankings-limit', type=int,
+                        help='Only select and write the best N courses instead of ranking every code found')
+    parser.add_argument('--windows', nargs='+', choices=WINDOWS, default=[],
+                        help='Also write rankings for these trailing windows, all from one pass over the analyzed threads')
+    parser.add_argument('--half-life-days', type=float,
+                        help='Weight threads in the window rankings by 0.5 ** (age / half-life)')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_READ_TIMEOUT,
+                        help='Seconds to wait for the Reddit API service to respond')
+    parser.add_argument('--connect-timeout', type=float, default=DEFAULT_CONNECT_TIMEOUT,
+                        help='Seconds to wait for a connection to the Reddit API service')
+    parser.add_argument('--retries', type=int, default=3,
+                        help='Retries (with jittered exponential backoff) for failed or rate-limited requests')
+    parser.add_argument('--pretty', action='store_true', help='Indent JSON output for debugging')
+    parser.add_argument('--report-file', help='Where to write the JSON run report (default: <processed-dir>/run_report.json)')
+    parser.add_argument('--prometheus-file', help='Also write run metrics in Prometheus text format to this file')
+    add_profile_arguments(parser, PIPELINE_STAGES)
     
     args = parser.parse_args()
+    if args.page_size < 1:
+        parser.error('--page-size must be at least 1')
+    
+    if args.download_nltk_data:
+        sys.exit(0 if download_nltk_data() else 1)
+    
+    set_pretty(args.pretty)
     
     # Prompt for time period if not using --no-prompt
     if not args.no_prompt:
@@ -136,15 +320,30 @@ def main():
                 break
             print("Invalid choice. Please enter a number between 1 and 6.")
     
-    run_pipeline(
-        args.api_url, 
-        args.limit, 
-        args.time_period, 
-        args.data_dir, 
-        args.processed_dir,
-        args.analyze_top_courses,
-        args.top_courses_count
-    )
+    profiler = Profiler(args.profile, args.processed_dir, args.profile_stages, "pipeline")
+    with profiler.section("run"), ServiceClient(args.connect_timeout, args.timeout, args.retries) as client:
+        run_pipeline(
+            args.api_url, 
+            args.limit, 
+            args.time_period, 
+            args.data_dir, 
+            args.processed_dir,
+            args.analyze_top_courses,
+            args.top_courses_count,
+            args.workers,
+            args.full_refresh,
+            args.format,
+            args.compress,
+            args.report_file,
+            args.prometheus_file,
+            profiler,
+            args.page_size,
+            args.rankings_limit,
+            args.windows,
+            args.half_life_days,
+            client
+        )
+    profiler.save()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -4,8 +4,17 @@ import json
 import argparse
 import datetime
 from sentiment_analyzer import SentimentAnalyzer
+from analysis_cache import AnalysisCache
+from course_aggregates import CourseAggregates, WINDOWS
+from json_output import save_to_json, set_pretty
+from profiling import Profiler, add_profile_arguments
+from ndjson_io import iter_ndjson, NDJSONWriter, tee_ndjson, write_ndjson
+from ranking_pages import PAGE_SIZE, write_ranking_pages
 from typing import List, Dict, Any
 
+# Sections accepted by --profile-stages
+PROCESS_STAGES = ["load", "analyze", "analyze_stream", "rankings", "windows", "write_json"]
+
 def load_threads_from_file(file_path: str) -> List[Dict[str, Any]]:
     """Load Reddit threads from a JSON file"""
     try:
@@ -15,22 +24,27 @@ def load_threads_from_file(file_path: str) -> List[Dict[str, Any]]:
         print(f"Error loading threads from {file_path}: {e}")
         return []
 
-def save_to_json(data: Any, file_path: str) -> None:
-    """Save data to a JSON file"""
-    try:
-        with open(file_path, 'w') as f:
-            json.dump(data, f, indent=2)
-        print(f"Data saved to {file_path}")
-    except Exception as e:
-        print(f"Error saving data to {file_path}: {e}")
-
-def process_threads(input_file: str, output_dir: str = "processed") -> None:
-    """Process Reddit threads with sentiment analysis"""
+def process_threads(input_file: str, output_dir: str = "processed", workers: int = 1,
+                    analysis_cache_file: str = None, output_format: str = "json", profiler: Profiler = None,
+                    page_size: int = PAGE_SIZE, top: int = None, windows: List[str] = (),
+                    half_life_days: float = None) -> None:
+    """Process Reddit threads with sentiment analysis.
+    
+    With top, only the best `top` courses are ranked and written. Each of windows also gets
+    its own rankings, computed in one pass over the analyzed threads."""
+    profiler = profiler or Profiler()
+    
     # Ensure output directory exists
     os.makedirs(output_dir, exist_ok=True)
     
+    if output_format == "ndjson":
+        process_threads_streaming(input_file, output_dir, workers, analysis_cache_file, profiler, page_size, top,
+                                  windows, half_life_days)
+        return
+    
     # Load threads
-    threads = load_threads_from_file(input_file)
+    with profiler.section("load"):
+        threads = load_threads_from_file(input_file)
     if not threads:
         print("No threads to process")
         return
@@ -40,39 +54,145 @@ def process_threads(input_file: str, output_dir: str = "processed") -> None:
     # Initialize sentiment analyzer
     analyzer = SentimentAnalyzer()
     
-    # Analyze threads
-    analyzed_threads = analyzer.analyze_threads(threads)
+    # Analyze threads, optionally reusing cached results for unchanged threads
+    if analysis_cache_file:
+        with profiler.section("analyze"), \
+                AnalysisCache(analysis_cache_file, analyzer.analysis_fingerprint()) as analysis_cache:
+            analyzed_threads = analyzer.analyze_threads(threads, workers=workers, cache=analysis_cache)
+        stats = analysis_cache.stats()
+        print(f"Analysis cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.1%} hit rate)")
+    else:
+        with profiler.section("analyze"):
+            analyzed_threads = analyzer.analyze_threads(threads, workers=workers)
     
-    # Generate course rankings
-    course_rankings = analyzer.get_course_rankings(analyzed_threads)
+    # Generate course rankings and their department/level rollups
+    with profiler.section("rankings"):
+        aggregates = CourseAggregates()
+        aggregates.apply(analyzed_threads)
+        course_rankings = aggregates.rankings(analyzer, top)
     
     # Generate timestamp for filenames
     timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
     
-    # Save analyzed threads
-    threads_output = os.path.join(output_dir, f"analyzed_threads_{timestamp}.json")
-    save_to_json(analyzed_threads, threads_output)
+    with profiler.section("write_json"):
+        # Save analyzed threads
+        threads_output = os.path.join(output_dir, f"analyzed_threads_{timestamp}.json")
+        save_to_json(analyzed_threads, threads_output)
+        
+        # Save course rankings
+        rankings_output = os.path.join(output_dir, f"course_rankings_{timestamp}.json")
+        save_to_json(course_rankings, rankings_output)
+        
+        # Save latest course rankings (overwrite previous)
+        latest_rankings = os.path.join(output_dir, "latest_course_rankings.json")
+        save_to_json(course_rankings, latest_rankings)
+        save_to_json(aggregates.rollups(), os.path.join(output_dir, "latest_course_rollups.json"))
+        write_ranking_pages(course_rankings, os.path.join(output_dir, "rankings"), page_size)
+    
+    if windows:
+        write_windowed_rankings(analyzer, analyzed_threads, output_dir, windows, half_life_days, page_size, top, profiler)
+    
+    print_summary(len(threads), len(aggregates.courses), course_rankings)
+
+def process_threads_streaming(input_file: str, output_dir: str, workers: int = 1,
+                              analysis_cache_file: str = None, profiler: Profiler = None,
+                              page_size: int = PAGE_SIZE, top: int = None, windows: List[str] = (),
+                              half_life_days: float = None) -> None:
+    """Process an NDJSON file of threads one record at a time.
     
-    # Save course rankings
-    rankings_output = os.path.join(output_dir, f"course_rankings_{timestamp}.json")
-    save_to_json(course_rankings, rankings_output)
+    Threads are read, analyzed, written and folded into running course aggregates as they
+    stream through, so memory is bounded by the per-course state rather than the corpus."""
+    profiler = profiler or Profiler()
+    analyzer = SentimentAnalyzer()
+    analysis_cache = AnalysisCache(analysis_cache_file, analyzer.analysis_fingerprint()) if analysis_cache_file else None
     
-    # Save latest course rankings (overwrite previous)
-    latest_rankings = os.path.join(output_dir, "latest_course_rankings.json")
-    save_to_json(course_rankings, latest_rankings)
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    threads_output = os.path.join(output_dir, f"analyzed_threads_{timestamp}.ndjson")
     
-    print(f"Processed {len(threads)} threads and identified {len(course_rankings)} courses")
+    print(f"Processing threads from {input_file}...")
+    aggregates = CourseAggregates()
+    try:
+        with profiler.section("analyze_stream"), NDJSONWriter(threads_output) as writer:
+            analyzed_threads = analyzer.iter_analyze_threads(iter_ndjson(input_file), workers=workers, cache=analysis_cache)
+            aggregates.apply(tee_ndjson(analyzed_threads, writer))
+    except Exception as e:
+        print(f"Error processing threads from {input_file}: {e}")
+        return
+    finally:
+        if analysis_cache:
+            analysis_cache.close()
+    print(f"Data saved to {threads_output}")
+    
+    if not writer.count:
+        print("No threads to process")
+        return
+    if analysis_cache:
+        stats = analysis_cache.stats()
+        print(f"Analysis cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.1%} hit rate)")
+    
+    with profiler.section("rankings"):
+        course_rankings = aggregates.rankings(analyzer, top)
+    
+    with profiler.section("write_json"):
+        write_ndjson(course_rankings, os.path.join(output_dir, f"course_rankings_{timestamp}.ndjson"))
+        
+        # The frontend reads the latest rankings as a single JSON document
+        save_to_json(course_rankings, os.path.join(output_dir, "latest_course_rankings.json"))
+        save_to_json(aggregates.rollups(), os.path.join(output_dir, "latest_course_rollups.json"))
+        write_ranking_pages(course_rankings, os.path.join(output_dir, "rankings"), page_size)
+    
+    if windows:
+        # One more streaming read of the analyzed threads; nothing is analyzed again
+        write_windowed_rankings(analyzer, iter_ndjson(threads_output), output_dir, windows, half_life_days, page_size,
+                                top, profiler)
+    
+    print_summary(writer.count, len(aggregates.courses), course_rankings)
+
+def write_windowed_rankings(analyzer: SentimentAnalyzer, analyzed_threads, output_dir: str, windows: List[str],
+                            half_life_days: float, page_size: int, top: int, profiler: Profiler) -> None:
+    """latest_course_rankings_<window>.json and paged rankings_<window>/ for each trailing window"""
+    with profiler.section("windows"):
+        windowed_rankings = analyzer.get_windowed_rankings(analyzed_threads, windows, half_life_days=half_life_days,
+                                                           top=top)
+    with profiler.section("write_json"):
+        for window, window_rankings in windowed_rankings.items():
+            save_to_json(window_rankings, os.path.join(output_dir, f"latest_course_rankings_{window}.json"))
+            write_ranking_pages(window_rankings, os.path.join(output_dir, f"rankings_{window}"), page_size)
+
+def print_summary(thread_count: int, course_count: int, course_rankings: List[Dict[str, Any]]) -> None:
+    print(f"Processed {thread_count} threads and identified {course_count} courses")
     print(f"Top 5 bird courses:")
     for i, course in enumerate(course_rankings[:5], 1):
         print(f"{i}. {course['code']} - Bird Score: {course['bird_score']:.2f} - Mentions: {course['mentions']}")
 
 def main():
     parser = argparse.ArgumentParser(description='Process Reddit threads with sentiment analysis')
-    parser.add_argument('input_file', help='Path to JSON file containing Reddit threads')
+    parser.add_argument('input_file', help='Path to JSON (or NDJSON with --format ndjson) file containing Reddit threads')
     parser.add_argument('--output-dir', '-o', default='processed', help='Directory to save processed data')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Worker processes for thread analysis (0 = all CPU cores)')
+    parser.add_argument('--analysis-cache', help='SQLite file caching per-thread analysis between runs')
+    parser.add_argument('--format', choices=['json', 'ndjson'], default='json',
+                        help='ndjson streams threads one per line instead of loading the whole file')
+    parser.add_argument('--pretty', action='store_true', help='Indent JSON output for debugging')
+    parser.add_argument('--page-size', type=int, default=PAGE_SIZE,
+                        help='Courses per rankings page file (<output-dir>/rankings/page_NNNN.json)')
+    parser.add_argument('--top', type=int, help='Only rank and write the best N courses')
+    parser.add_argument('--windows', nargs='+', choices=WINDOWS, default=[],
+                        help='Also write rankings for these trailing windows, all from one pass over the analyzed threads')
+    parser.add_argument('--half-life-days', type=float,
+                        help='Weight threads in the window rankings by 0.5 ** (age / half-life)')
+    add_profile_arguments(parser, PROCESS_STAGES)
     
     args = parser.parse_args()
-    process_threads(args.input_file, args.output_dir)
+    if args.page_size < 1:
+        parser.error('--page-size must be at least 1')
+    set_pretty(args.pretty)
+    profiler = Profiler(args.profile, args.output_dir, args.profile_stages, "process_threads")
+    with profiler.section("run"):
+        process_threads(args.input_file, args.output_dir, args.workers, args.analysis_cache, args.format, profiler,
+                        args.page_size, args.top, args.windows, args.half_life_days)
+    profiler.save()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,108 @@
+import os
+import io
+import pstats
+import cProfile
+import datetime
+import tracemalloc
+from contextlib import contextmanager
+from typing import List, Iterator
+
+PROFILE_MODES = ["cpu", "mem"]
+
+class Profiler:
+    """Opt-in cProfile (cpu) or tracemalloc (mem) profiling of named run sections.
+
+    With no stages selected the "run" section (the whole entry point) is profiled;
+    otherwise only the listed sections are, so profiler overhead does not skew the
+    others. Sections entered repeatedly accumulate into one report. Reports are
+    written to output_dir as <name>_<section>_<timestamp>.prof/.txt.
+    """
+
+    def __init__(self, mode: str = None, output_dir: str = ".", stages: List[str] = None, name: str = "profile"):
+        self.mode = mode
+        self.output_dir = output_dir
+        self.stages = set(stages or [])
+        self.name = name
+        self.timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.cpu_profiles = {}   # section -> cProfile.Profile
+        self.mem_reports = {}    # section -> [report text per call]
+        self.active = None
+
+    def enabled_for(self, section: str) -> bool:
+        if not self.mode or self.active is not None:
+            return False
+        return section in self.stages if self.stages else section == "run"
+
+    @contextmanager
+    def section(self, name: str) -> Iterator[None]:
+        if not self.enabled_for(name):
+            yield
+            return
+
+        self.active = name
+        try:
+            if self.mode == "cpu":
+                profile = self.cpu_profiles.setdefault(name, cProfile.Profile())
+                profile.enable()
+                try:
+                    yield
+                finally:
+                    profile.disable()
+            else:
+                was_tracing = tracemalloc.is_tracing()
+                if not was_tracing:
+                    tracemalloc.start(25)
+                tracemalloc.reset_peak()
+                before = tracemalloc.take_snapshot()
+                try:
+                    yield
+                finally:
+                    after = tracemalloc.take_snapshot()
+                    current, peak = tracemalloc.get_traced_memory()
+                    if not was_tracing:
+                        tracemalloc.stop()
+                    self.mem_reports.setdefault(name, []).append(self._mem_report(before, after, current, peak))
+        finally:
+            self.active = None
+
+    @staticmethod
+    def _mem_report(before, after, current: int, peak: int, limit: int = 25) -> str:
+        lines = [f"Traced memory: {current / 1024 / 1024:.1f} MB current, {peak / 1024 / 1024:.1f} MB peak",
+                 f"Top {limit} allocation sites by growth during the section:"]
+        for stat in after.compare_to(before, "lineno")[:limit]:
+            lines.append(f"  {stat}")
+        return "\n".join(lines)
+
+    def save(self) -> List[str]:
+        """Write every collected report; returns the files written"""
+        if not self.cpu_profiles and not self.mem_reports:
+            return []
+        os.makedirs(self.output_dir, exist_ok=True)
+        written = []
+
+        for section, profile in self.cpu_profiles.items():
+            base = os.path.join(self.output_dir, f"{self.name}_{section}_{self.timestamp}")
+            profile.dump_stats(base + ".prof")
+            summary = io.StringIO()
+            pstats.Stats(profile, stream=summary).sort_stats("cumulative").print_stats(40)
+            with open(base + ".txt", 'w') as f:
+                f.write(summary.getvalue())
+            written += [base + ".prof", base + ".txt"]
+
+        for section, reports in self.mem_reports.items():
+            path = os.path.join(self.output_dir, f"{self.name}_{section}_{self.timestamp}_mem.txt")
+            with open(path, 'w') as f:
+                for i, report in enumerate(reports, 1):
+                    f.write(f"== {section} call {i} ==\n{report}\n\n")
+            written.append(path)
+
+        for path in written:
+            print(f"Profile saved to {path}")
+        return written
+
+def add_profile_arguments(parser, stages: List[str]) -> None:
+    """--profile and --profile-stages for an entry point whose sections are `stages`"""
+    parser.add_argument('--profile', choices=PROFILE_MODES,
+                        help='Profile the run with cProfile (cpu) or tracemalloc (mem); reports go next to the outputs')
+    parser.add_argument('--profile-stages', nargs='+', choices=stages, default=[],
+                        help='Only profile these stages instead of the whole run')
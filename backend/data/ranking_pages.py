@@ -0,0 +1,64 @@
+import os
+import re
+import json
+from typing import List, Dict, Any, Iterable
+from json_output import COMPRESSIONS, write_json
+
+PAGE_SIZE = 100
+PAGE_FILE = re.compile(r'^page_(\d+)\.json$')
+
+def page_file(number: int) -> str:
+    return f"page_{number:04d}.json"
+
+def write_ranking_pages(course_rankings: List[Dict[str, Any]], output_dir: str, page_size: int = PAGE_SIZE,
+                        compressions: Iterable[str] = ()) -> Dict[str, Any]:
+    """Write rankings (already sorted) as fixed-size page files plus index.json; returns the index.
+
+    The index lists each page's rank and bird_score range, so readers can fetch only the
+    pages they need. Pages left over from a longer previous ranking are removed."""
+    if page_size < 1:
+        raise ValueError(f"page_size must be at least 1, not {page_size}")
+    os.makedirs(output_dir, exist_ok=True)
+    compressions = list(compressions)
+
+    pages = []
+    for start in range(0, len(course_rankings), page_size):
+        courses = course_rankings[start:start + page_size]
+        number = len(pages) + 1
+        write_json(courses, os.path.join(output_dir, page_file(number)), compressions)
+        pages.append({
+            "page": number,
+            "file": page_file(number),
+            "first_rank": start + 1,
+            "last_rank": start + len(courses),
+            "max_bird_score": courses[0]["bird_score"],
+            "min_bird_score": courses[-1]["bird_score"]
+        })
+
+    index = {"page_size": page_size, "total_courses": len(course_rankings), "pages": pages}
+    # Write the index last so it never points at a page that is not there yet
+    write_json(index, os.path.join(output_dir, "index.json"), compressions)
+
+    for name in os.listdir(output_dir):
+        match = PAGE_FILE.match(name)
+        if match and int(match.group(1)) > len(pages):
+            os.remove(os.path.join(output_dir, name))
+            for suffix in COMPRESSIONS.values():
+                if os.path.exists(os.path.join(output_dir, name + suffix)):
+                    os.remove(os.path.join(output_dir, name + suffix))
+
+    print(f"Rankings saved to {output_dir} ({len(pages)} pages of up to {page_size} courses)")
+    return index
+
+def read_top_courses(rankings_dir: str, count: int) -> List[Dict[str, Any]]:
+    """The best `count` ranked courses, reading only the pages that hold them"""
+    with open(os.path.join(rankings_dir, "index.json"), 'r') as f:
+        index = json.load(f)
+
+    courses = []
+    for page in index["pages"]:
+        if len(courses) >= count:
+            break
+        with open(os.path.join(rankings_dir, page["file"]), 'r') as f:
+            courses.extend(json.load(f))
+    return courses[:count]
@@ -0,0 +1,99 @@
+import os
+import time
+import datetime
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator
+from json_output import save_to_json, write_atomic
+from profiling import Profiler
+
+def cpu_seconds() -> float:
+    """CPU time of this process plus its finished children (analysis worker pools)"""
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+class RunMetrics:
+    """Per-stage wall/CPU timers and named counters for one pipeline run.
+
+    Stages with the same name accumulate, so a stage can be entered repeatedly
+    (every JSON write, for example) and is reported once with its call count.
+    Stages are also profiler sections, so --profile-stages uses the same names.
+    """
+
+    def __init__(self, prefix: str = "birdwatch", profiler: Profiler = None):
+        self.prefix = prefix
+        self.profiler = profiler or Profiler()
+        self.started = datetime.datetime.now(datetime.timezone.utc)
+        self.stages = {}    # name -> {"wall_seconds", "cpu_seconds", "calls"}
+        self.counters = {}  # name -> number
+        self.requests = {}  # endpoint -> {"calls", "retries", "errors", "p50_ms", "p95_ms", "max_ms"}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        wall_start, cpu_start = time.perf_counter(), cpu_seconds()
+        try:
+            with self.profiler.section(name):
+                yield
+        finally:
+            stage = self.stages.setdefault(name, {"wall_seconds": 0.0, "cpu_seconds": 0.0, "calls": 0})
+            stage["wall_seconds"] += time.perf_counter() - wall_start
+            stage["cpu_seconds"] += cpu_seconds() - cpu_start
+            stage["calls"] += 1
+
+    def count(self, name: str, value: float = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def set(self, name: str, value: float) -> None:
+        self.counters[name] = value
+
+    def set_requests(self, stats: Dict[str, Dict[str, Any]]) -> None:
+        """Per-endpoint HTTP stats, as returned by ServiceClient.stats()"""
+        self.requests = dict(stats)
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "started": self.started.isoformat(timespec="seconds"),
+            "wall_seconds": round((datetime.datetime.now(datetime.timezone.utc) - self.started).total_seconds(), 4),
+            "stages": {
+                name: {key: round(value, 4) if isinstance(value, float) else value for key, value in stage.items()}
+                for name, stage in self.stages.items()
+            },
+            "counters": dict(self.counters),
+            "requests": dict(self.requests)
+        }
+
+    def prometheus_text(self) -> str:
+        """The report in the Prometheus text exposition format (for the node_exporter textfile collector)"""
+        report = self.report()
+        lines = []
+
+        def metric(name, help_text, samples):
+            lines.append(f"# HELP {self.prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {self.prefix}_{name} gauge")
+            for labels, value in samples:
+                lines.append(f"{self.prefix}_{name}{labels} {value}")
+
+        metric("run_timestamp_seconds", "Start time of the last run", [("", self.started.timestamp())])
+        metric("run_wall_seconds", "Wall-clock duration of the last run", [("", report["wall_seconds"])])
+        for key, help_text in (("wall_seconds", "Wall-clock time spent in each stage"),
+                               ("cpu_seconds", "CPU time spent in each stage, including worker processes"),
+                               ("calls", "Times each stage ran")):
+            metric(f"stage_{key}", help_text,
+                   [(f'{{stage="{name}"}}', stage[key]) for name, stage in report["stages"].items()])
+        for name, value in report["counters"].items():
+            metric(name, f"Pipeline counter {name}", [("", value)])
+        for key, help_text in (("calls", "Finished requests to each service endpoint"),
+                               ("retries", "Retried requests to each service endpoint"),
+                               ("errors", "Failed requests to each service endpoint after retries"),
+                               ("p50_ms", "Median response latency of each service endpoint in milliseconds"),
+                               ("p95_ms", "95th percentile response latency of each service endpoint in milliseconds")):
+            samples = [(f'{{endpoint="{endpoint}"}}', stats[key])
+                       for endpoint, stats in report["requests"].items() if stats[key] is not None]
+            if samples:
+                metric(f"request_{key}", help_text, samples)
+        return "\n".join(lines) + "\n"
+
+    def save(self, report_file: str, prometheus_file: str = None) -> None:
+        save_to_json(self.report(), report_file)
+        if prometheus_file:
+            write_atomic(self.prometheus_text().encode("utf-8"), prometheus_file)
+            print(f"Metrics saved to {prometheus_file}")
@@ -1,23 +1,40 @@
 import re
-import nltk
-import pandas as pd
-from nltk.sentiment.vader import SentimentIntensityAnalyzer
 import json
 import os
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple, Iterable, Iterator
+from itertools import islice
 import string
+from functools import lru_cache
+from contextlib import contextmanager
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+from term_matcher import TermMatcher
+from course_aggregates import CourseAggregates, WindowedAggregates, WINDOWS
+from bird_score import RANKING_COLUMNS, build_table, ranking_scores, table_rows
+from analysis_cache import AnalysisCache
+from nltk_resources import ensure_nltk_resources
 
-# Initialize sentiment analyzer - download all required resources
-nltk.download('vader_lexicon')
-nltk.download('punkt')
-nltk.download('stopwords')
-nltk.download('wordnet')
+# Bump when analyze_thread changes in a way that invalidates cached analyses
+ANALYSIS_VERSION = 3
 
 class SentimentAnalyzer:
-    def __init__(self):
+    def __init__(self, score_cache_size: int = 50000):
+        # NLTK is imported lazily so importing this module stays cheap and offline
+        ensure_nltk_resources()
+        import nltk
+        from nltk.sentiment.vader import SentimentIntensityAnalyzer
+        
         self.sia = SentimentIntensityAnalyzer()
         self.customize_vader_lexicon()
         
+        # Memoize VADER by text so reposts and shared context sentences are scored once
+        self.score_cache_size = score_cache_size
+        self._cached_polarity_scores = lru_cache(maxsize=score_cache_size)(self._vader_polarity_scores)
+        
+        # Work counters (threads, sentences, VADER calls, lexicon hits) for run reports
+        self.counters = Counter()
+        
         # Regular expression to find course codes
         self.course_pattern = re.compile(r'\b[A-Z]{2,4}[0-9]{3,4}\b')
         
@@ -151,9 +168,16 @@ class SentimentAnalyzer:
             'EM': 1.5,   # Educational Studies
         }
         
+        # Compile both lexicons into a single-pass matcher
+        self.compile_term_matcher()
+        
         # Load stopwords
         self.stopwords = set(nltk.corpus.stopwords.words('english'))
         
+    def compile_term_matcher(self):
+        """Rebuild the bird/anti-bird term matcher; call again after editing either lexicon"""
+        self.term_matcher = TermMatcher([("", self.bird_terms), ("anti:", self.anti_bird_terms)])
+        
     def customize_vader_lexicon(self):
         """Add domain-specific terms to VADER lexicon"""
         academic_lexicon = {
@@ -205,6 +229,30 @@ class SentimentAnalyzer:
         for word, score in academic_lexicon.items():
             self.sia.lexicon[word] = score
             
+    def _vader_polarity_scores(self, text: str) -> Dict[str, float]:
+        self.counters["vader_calls"] += 1
+        return self.sia.polarity_scores(text)
+    
+    def polarity_scores(self, text: str) -> Dict[str, float]:
+        """VADER polarity scores for text, served from the bounded LRU cache when possible"""
+        return dict(self._cached_polarity_scores(text))
+    
+    def score_cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for the VADER score cache"""
+        info = self._cached_polarity_scores.cache_info()
+        lookups = info.hits + info.misses
+        return {
+            "hits": info.hits,
+            "misses": info.misses,
+            "size": info.currsize,
+            "max_size": info.maxsize,
+            "hit_rate": info.hits / lookups if lookups else 0.0
+        }
+    
+    def clear_score_cache(self) -> None:
+        """Drop cached VADER scores; needed after editing self.sia.lexicon"""
+        self._cached_polarity_scores.cache_clear()
+        
     def preprocess_text(self, text: str) -> str:
         text = text.lower()
         text = re.sub(r'http\S+', '', text)
@@ -218,15 +266,21 @@ class SentimentAnalyzer:
         
     def analyze_thread(self, thread: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze sentiment of a Reddit thread and extract course mentions with improved scoring"""
+        self.counters["threads_analyzed"] += 1
         full_text = f"{thread['title']} {thread['selftext']}"
         preprocessed_text = self.preprocess_text(full_text)
         
-        sentiment = self.sia.polarity_scores(preprocessed_text)
+        sentiment = self.polarity_scores(preprocessed_text)
+        thread_bird_terms = self.term_matcher.count(full_text.lower())
         courses_mentioned = self.extract_courses(full_text)
         
+        # Split the thread once and share the per-sentence work between all its courses
+        table = self._build_sentence_table(full_text, courses_mentioned)
+        
         course_sentiments = {}
         for course in courses_mentioned:
-            sentences = self._find_sentences_with_course(full_text, course)
+            indices = self._course_context_indices(table, course)
+            sentences = [table["sentences"][i] for i in indices]
             
             course_sentiment = {
                 "compound": 0,
@@ -238,6 +292,8 @@ class SentimentAnalyzer:
                 "context_score": 0,
                 "experience_score": 0,
                 "title_mention": False,
+                # [start, end, compound, names the course] per scored sentence; offsets into "title selftext"
+                "sentences": [],
                 "structured_topics": {
                     "workload": 0,
                     "difficulty": 0,
@@ -251,19 +307,20 @@ class SentimentAnalyzer:
                 total_bird_score = 0
                 sentence_weights = []
                 
-                for sentence in sentences:
-                    processed_sentence = self.preprocess_text(sentence)
+                for index, sentence in zip(indices, sentences):
+                    features = self._sentence_features(table, index)
+                    sentence_lower = features["lower"]
                     
-                    sent = self.sia.polarity_scores(processed_sentence)
+                    sent = dict(features["vader"])
                     
                     weight = 1.0
                     if course in sentence:
                         weight *= 1.5
-                    if any(term in sentence.lower() for term in ['highly', 'very', 'really', 'definitely', 'absolutely']):
+                    if any(term in sentence_lower for term in ['highly', 'very', 'really', 'definitely', 'absolutely']):
                         weight *= 1.3
                     
-                    bird_term_score = self.detect_bird_terms(processed_sentence)
-                    bird_terms = self.detect_bird_terms_dict(processed_sentence)
+                    bird_term_score = features["bird_term_score"]
+                    bird_terms = features["bird_terms"]
                     
                     for term, count in bird_terms.items():
                         if term in course_sentiment["bird_terms"]:
@@ -272,6 +329,8 @@ class SentimentAnalyzer:
                             course_sentiment["bird_terms"][term] = count
                     
                     sent["compound"] = min(1.0, max(-1.0, sent["compound"] + (bird_term_score * 0.4)))
+                    start, end = table["spans"][index]
+                    course_sentiment["sentences"].append([start, end, round(sent["compound"], 4), course in sentence])
                     
                     sentence_weights.append(weight)
                     course_sentiment["compound"] += sent["compound"] * weight
@@ -280,7 +339,7 @@ class SentimentAnalyzer:
                     course_sentiment["neu"] += sent["neu"] * weight
                     total_bird_score += bird_term_score * weight
                     
-                    self._update_structured_topics(sentence.lower(), course_sentiment["structured_topics"])
+                    self._update_structured_topics(sentence_lower, course_sentiment["structured_topics"])
                 
                 total_weight = sum(sentence_weights)
                 if total_weight > 0:
@@ -308,6 +367,7 @@ class SentimentAnalyzer:
         
         thread_with_sentiment = thread.copy()
         thread_with_sentiment["sentiment"] = sentiment
+        thread_with_sentiment["bird_terms"] = thread_bird_terms
         thread_with_sentiment["courses"] = course_sentiments
         
         return thread_with_sentiment
@@ -391,181 +451,264 @@ class SentimentAnalyzer:
         return max(-1.0, min(1.0, score))
     
     def detect_bird_terms(self, text: str) -> float:
-        text = text.lower()
-        score = 0.0
-        for term, value in self.bird_terms.items():
-            if term in text:
-                score += value * text.count(term)
-        for term, value in self.anti_bird_terms.items():
-            if term in text:
-                score += value * text.count(term)
-        return score
+        return self.term_matcher.match(text)[0]
     
     def detect_bird_terms_dict(self, text: str) -> Dict[str, int]:
-        text = text.lower()
-        found_terms = {}
-        for term in self.bird_terms:
-            if term in text:
-                found_terms[term] = text.count(term)
-        for term in self.anti_bird_terms:
-            if term in text:
-                found_terms[f"anti:{term}"] = text.count(term)
-        return found_terms
+        return self.term_matcher.match(text)[1]
     
     def extract_courses(self, text: str) -> List[str]:
         return list(set(self.course_pattern.findall(text)))
     
-    def _find_sentences_with_course(self, text: str, course: str) -> List[str]:
+    def _split_sentences(self, text: str) -> Tuple[List[str], bool]:
+        """Split text into sentences, falling back to punctuation splitting without punkt.
+        
+        The flag tells whether context windows should be deduplicated by sentence text,
+        which is what the punkt path has always done."""
+        import nltk
         try:
-            sentences = nltk.sent_tokenize(text)
-            course_sentences = [sent for sent in sentences if course in sent]
-            context_sentences = []
-            for i, sent in enumerate(sentences):
-                if course in sent:
-                    if i > 0:
-                        context_sentences.append(sentences[i-1])
-                    if i < len(sentences) - 1:
-                        context_sentences.append(sentences[i+1])
-            all_sentences = course_sentences + context_sentences
-            return list(set(all_sentences))
+            return nltk.sent_tokenize(text), True
         except LookupError:
-            return self._find_sentences_with_course_simple(text, course)
-            
-    def _find_sentences_with_course_simple(self, text: str, course: str) -> List[str]:
-        rough_sentences = re.split(r'[.!?]+', text)
-        direct_mentions = [sent.strip() for sent in rough_sentences if course in sent]
-        indices = []
-        for i, sent in enumerate(rough_sentences):
-            if course in sent:
-                indices.append(i)
-        context_sentences = []
-        for idx in indices:
-            if idx > 0:
-                context_sentences.append(rough_sentences[idx-1].strip())
-            if idx < len(rough_sentences) - 1:
-                context_sentences.append(rough_sentences[idx+1].strip())
-        all_sentences = direct_mentions + context_sentences
-        return [s for s in all_sentences if s]
+            return [sent.strip() for sent in re.split(r'[.!?]+', text)], False
+    
+    def _build_sentence_table(self, text: str, courses: List[str]) -> Dict[str, Any]:
+        """Tokenize a thread once and index which sentences mention each course"""
+        sentences, unique_context = self._split_sentences(text)
+        self.counters["sentences"] += len(sentences)
+        
+        spans = []
+        position = 0
+        for sentence in sentences:
+            start = text.find(sentence, position)
+            if start < 0:
+                start = position
+            position = start + len(sentence)
+            spans.append((start, position))
+        
+        course_index = {course: [] for course in courses}
+        for i, sentence in enumerate(sentences):
+            for course in courses:
+                if course in sentence:
+                    course_index[course].append(i)
+        
+        return {
+            "sentences": sentences,
+            "spans": spans,
+            "course_index": course_index,
+            "unique_context": unique_context,
+            "features": {}
+        }
+    
+    def _course_context_indices(self, table: Dict[str, Any], course: str) -> List[int]:
+        """Sentence indices mentioning a course, followed by their immediate neighbours"""
+        sentences = table["sentences"]
+        direct = table["course_index"].get(course, [])
+        context = []
+        for i in direct:
+            if i > 0:
+                context.append(i - 1)
+            if i < len(sentences) - 1:
+                context.append(i + 1)
+        
+        if table["unique_context"]:
+            first_seen = {}
+            for i in direct + context:
+                first_seen.setdefault(sentences[i], i)
+            return list(first_seen.values())
+        return [i for i in direct + context if sentences[i]]
+    
+    def _sentence_features(self, table: Dict[str, Any], index: int) -> Dict[str, Any]:
+        """Preprocess, VADER-score and term-match a sentence the first time any course needs it"""
+        features = table["features"].get(index)
+        if features is None:
+            sentence = table["sentences"][index]
+            processed = self.preprocess_text(sentence)
+            bird_term_score, bird_terms = self.term_matcher.match(processed)
+            self.counters["lexicon_hits"] += sum(bird_terms.values())
+            features = {
+                "processed": processed,
+                "lower": sentence.lower(),
+                "vader": self.polarity_scores(processed),
+                "bird_term_score": bird_term_score,
+                "bird_terms": bird_terms
+            }
+            table["features"][index] = features
+        return features
                 
-    def analyze_threads(self, threads: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def analyze_threads(self, threads: List[Dict[str, Any]], workers: int = 1, chunksize: int = None,
+                        cache: "AnalysisCache" = None, pool: ProcessPoolExecutor = None) -> List[Dict[str, Any]]:
+        """Analyze threads in input order, optionally spread over a pool of worker processes.
+        
+        workers=0 uses every CPU core. Each worker builds its own analyzer once with this
+        analyzer's lexicons, and threads are shipped to it in chunks. An open pool from
+        worker_pool() can be passed in to keep the same warm workers across calls. With a
+        cache, threads whose text and analyzer fingerprint are unchanged are not analyzed again."""
+        if cache is None:
+            return self._analyze_uncached(threads, workers, chunksize, pool)
+        
         analyzed_threads = []
+        pending = []
         for thread in threads:
-            analyzed_thread = self.analyze_thread(thread)
+            cached = cache.get(thread)
+            if cached is None:
+                pending.append(len(analyzed_threads))
+                analyzed_threads.append(thread)
+            else:
+                analyzed_thread = thread.copy()
+                analyzed_thread.update(cached)
+                analyzed_threads.append(analyzed_thread)
+        
+        fresh = self._analyze_uncached([analyzed_threads[i] for i in pending], workers, chunksize, pool)
+        for i, analyzed_thread in zip(pending, fresh):
+            analyzed_threads[i] = analyzed_thread
+            cache.put(analyzed_thread)
+        return analyzed_threads
+    
+    def iter_analyze_threads(self, threads: Iterable[Dict[str, Any]], workers: int = 1, chunksize: int = None,
+                             cache: "AnalysisCache" = None, window: int = 256) -> Iterator[Dict[str, Any]]:
+        """Streaming analyze_threads: consume and yield threads in bounded windows, in input order.
+
+        One worker pool serves every window, so workers and their VADER caches stay warm."""
+        if workers == 0:
+            workers = os.cpu_count() or 1
+        window = max(window, workers * (chunksize or 1) * 4)
+        threads = iter(threads)
+        with self.worker_pool(workers) as pool:
+            while True:
+                batch = list(islice(threads, window))
+                if not batch:
+                    return
+                yield from self.analyze_threads(batch, workers, chunksize, cache, pool)
+    
+    @contextmanager
+    def worker_pool(self, workers: int) -> Iterator[ProcessPoolExecutor]:
+        """Worker processes set up with this analyzer's configuration, or None when workers <= 1"""
+        if workers == 0:
+            workers = os.cpu_count() or 1
+        if workers <= 1:
+            yield None
+            return
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(self.worker_config(),)) as pool:
+            yield pool
+    
+    def analysis_fingerprint(self) -> str:
+        """Fingerprint of everything analyze_thread depends on besides the thread text"""
+        config = json.dumps([ANALYSIS_VERSION, self.config_fingerprint(), sorted(self.sia.lexicon.items())])
+        return hashlib.sha1(config.encode("utf-8")).hexdigest()
+    
+    def _analyze_uncached(self, threads: List[Dict[str, Any]], workers: int, chunksize: int,
+                          pool: ProcessPoolExecutor = None) -> List[Dict[str, Any]]:
+        if workers == 0:
+            workers = os.cpu_count() or 1
+        if workers <= 1 or len(threads) < 2:
+            analyzed_threads = []
+            for thread in threads:
+                analyzed_thread = self.analyze_thread(thread)
+                analyzed_threads.append(analyzed_thread)
+            return analyzed_threads
+        
+        if pool is None:
+            with self.worker_pool(min(workers, len(threads))) as pool:
+                return self._analyze_uncached(threads, workers, chunksize, pool)
+        
+        if chunksize is None:
+            chunksize = max(1, len(threads) // (min(workers, len(threads)) * 4))
+        analyzed_threads = []
+        for analyzed_thread, counters in pool.map(_analyze_in_worker, threads, chunksize=chunksize):
             analyzed_threads.append(analyzed_thread)
+            self.counters.update(counters)
         return analyzed_threads
     
-    def get_course_rankings(self, threads: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def worker_config(self) -> Dict[str, Any]:
+        """Settings a worker process needs to rebuild an equivalent analyzer, VADER lexicon edits included"""
+        return {
+            "score_cache_size": self.score_cache_size,
+            "bird_terms": self.bird_terms,
+            "anti_bird_terms": self.anti_bird_terms,
+            "department_adjustments": self.department_adjustments,
+            "vader_lexicon": self.sia.lexicon
+        }
+    
+    @classmethod
+    def from_worker_config(cls, config: Dict[str, Any]) -> "SentimentAnalyzer":
+        analyzer = cls(config["score_cache_size"])
+        analyzer.bird_terms = config["bird_terms"]
+        analyzer.anti_bird_terms = config["anti_bird_terms"]
+        analyzer.department_adjustments = config["department_adjustments"]
+        analyzer.sia.lexicon = config["vader_lexicon"]
+        analyzer.compile_term_matcher()
+        analyzer.clear_score_cache()
+        return analyzer
+    
+    def get_course_rankings(self, threads: List[Dict[str, Any]], top: int = None) -> List[Dict[str, Any]]:
+        """Courses ranked by bird_score; with top, only the best `top` (see CourseAggregates.rankings)"""
         analyzed_threads = threads
         if threads and "sentiment" not in threads[0]:
             analyzed_threads = self.analyze_threads(threads)
-            
-        course_data = {}
-        for thread in analyzed_threads:
-            for course, sentiment in thread.get("courses", {}).items():
-                if course not in course_data:
-                    course_data[course] = {
-                        "code": course,
-                        "department": course[:2],
-                        "mentions": 0,
-                        "score": 0,
-                        "compound": 0,
-                        "pos": 0,
-                        "neu": 0,
-                        "neg": 0,
-                        "bird_score": 0,
-                        "bird_terms": {},
-                        "threads": []
-                    }
-                
-                course_data[course]["mentions"] += sentiment["mentions"]
-                course_data[course]["compound"] += sentiment["compound"] * sentiment["mentions"]
-                course_data[course]["pos"] += sentiment["pos"] * sentiment["mentions"]
-                course_data[course]["neu"] += sentiment["neu"] * sentiment["mentions"]
-                course_data[course]["neg"] += sentiment["neg"] * sentiment["mentions"]
-                course_data[course]["score"] += thread["score"]
-                
-                for term, count in sentiment.get("bird_terms", {}).items():
-                    if term in course_data[course]["bird_terms"]:
-                        course_data[course]["bird_terms"][term] += count
-                    else:
-                        course_data[course]["bird_terms"][term] = count
-                
-                thread_info = {
-                    "id": thread["id"],
-                    "title": thread["title"],
-                    "url": thread["url"],
-                    "score": thread["score"],
-                    "sentiment": sentiment["compound"]
-                }
-                
-                if "title_mention" in sentiment:
-                    thread_info["title_mention"] = sentiment["title_mention"]
-                    
-                course_data[course]["threads"].append(thread_info)
-                
-        for course in course_data.values():
-            if course["mentions"] > 0:
-                course["compound"] /= course["mentions"]
-                course["pos"] /= course["mentions"]
-                course["neu"] /= course["mentions"]
-                course["neg"] /= course["mentions"]
-                
-            bird_term_score = 0
+        
+        aggregates = CourseAggregates()
+        aggregates.apply(analyzed_threads)
+        return aggregates.rankings(self, top)
+    
+    def get_windowed_rankings(self, threads: Iterable[Dict[str, Any]], windows: List[str] = WINDOWS, now: float = None,
+                              half_life_days: float = None, top: int = None) -> Dict[str, List[Dict[str, Any]]]:
+        """Rankings for several trailing time windows from one pass over the threads.
+        
+        Threads not analyzed yet are analyzed on the way; see WindowedAggregates for the windows and decay."""
+        windowed = WindowedAggregates(windows, now, half_life_days)
+        windowed.apply(thread if "sentiment" in thread else self.analyze_thread(thread) for thread in threads)
+        return windowed.rankings(self, top)
+    
+    def config_fingerprint(self) -> str:
+        """Hash of the lexicons and adjustments that shape analysis and scoring"""
+        config = json.dumps([self.bird_terms, self.anti_bird_terms, self.department_adjustments], sort_keys=True)
+        return hashlib.sha1(config.encode("utf-8")).hexdigest()
+    
+    def score_courses(self, courses: List[Dict[str, Any]]) -> List[Dict[str, float]]:
+        """Compute bird_score and its components for many courses' running sums at once.
+
+        Each course carries its summed fields, bird_terms, total_comments and thread_count."""
+        rows = []
+        for course in courses:
+            bird_term_sum = 0
             for term, count in course["bird_terms"].items():
                 if term.startswith("anti:"):
                     actual_term = term[5:]
-                    bird_term_score += self.anti_bird_terms.get(actual_term, 0) * count
+                    bird_term_sum += self.anti_bird_terms.get(actual_term, 0) * count
                 else:
-                    bird_term_score += self.bird_terms.get(term, 0) * count
-                    
-            if course["mentions"] > 0:
-                bird_term_score /= course["mentions"]
-                
-            title_mentions = sum(1 for thread in course["threads"] if thread.get("title_mention", False))
-            title_bonus = title_mentions * 0.3
-                
-            dept_code = course["department"]
-            dept_adjustment = self.department_adjustments.get(dept_code, 0)
-            
-            total_comments = sum(thread.get("num_comments", 0) for thread in course["threads"])
-            avg_comments = total_comments / len(course["threads"]) if course["threads"] else 0
-            comment_factor = min(0.5, max(-0.5, (avg_comments - 10) / -20))
-            
-            course_number = 0
-            try:
-                numeric_part = re.search(r'\d+', course["code"])
-                if numeric_part:
-                    course_number = int(numeric_part.group())
-            except (ValueError, AttributeError):
-                pass
-                
-            level_adjustment = 0
-            if course_number >= 300:
-                level_adjustment = -0.5
-            elif course_number >= 200:
-                level_adjustment = -0.3
-            elif course_number >= 100:
-                level_adjustment = 0
-                
-            course["bird_score"] = (
-                (course["compound"] * 2.5) +
-                (min(1.5, course["mentions"] / 5)) +
-                (course["pos"] * 2) -
-                (course["neg"] * 3) +
-                (bird_term_score * 1.5) +
-                (min(0.8, course["score"] / 50)) +
-                title_bonus +
-                dept_adjustment +
-                comment_factor +
-                level_adjustment
-            )
-            
-            course["bird_term_score"] = bird_term_score
-            course["dept_adjustment"] = dept_adjustment
-            course["comment_factor"] = comment_factor
-            course["level_adjustment"] = level_adjustment
-        
-        course_list = list(course_data.values())
-        course_list.sort(key=lambda x: x["bird_score"], reverse=True)
+                    bird_term_sum += self.bird_terms.get(term, 0) * count
+
+            rows.append({
+                "code": course["code"],
+                "department": course["department"],
+                "mentions": course["mentions"],
+                "score": course["score"],
+                "compound": course["compound"],
+                "pos": course["pos"],
+                "neu": course["neu"],
+                "neg": course["neg"],
+                "bird_term_sum": bird_term_sum,
+                "title_mentions": course["title_mentions"],
+                "total_comments": course["total_comments"],
+                "thread_count": course["thread_count"]
+            })
         
-        return course_list
\ No newline at end of file
+        if not rows:
+            return []
+        table = build_table(rows, RANKING_COLUMNS)
+        return table_rows(ranking_scores(table, self.department_adjustments))
+
+
+# Analyzer owned by a worker process of SentimentAnalyzer.analyze_threads
+_worker_analyzer = None
+
+def _init_worker(config: Dict[str, Any]) -> None:
+    global _worker_analyzer
+    _worker_analyzer = SentimentAnalyzer.from_worker_config(config)
+
+def _analyze_in_worker(thread: Dict[str, Any]) -> Tuple[Dict[str, Any], Counter]:
+    """Analyze one thread, returning the work counters it added so the parent can total them"""
+    _worker_analyzer.counters.clear()
+    analyzed_thread = _worker_analyzer.analyze_thread(thread)
+    # A copy: results are pickled per chunk, after the shared counters were cleared for the next thread
+    return analyzed_thread, Counter(_worker_analyzer.counters)
@@ -0,0 +1,133 @@
+import os
+import random
+import argparse
+import datetime
+from typing import List, Dict, Any
+from json_output import save_to_json
+from ndjson_io import write_ndjson
+
+# Offline stand-in for the Reddit API service: threads shaped like /api/bird-courses
+# responses, with lengths and term frequencies loosely matched to r/WLU posts.
+
+DEPARTMENTS = ["CP", "BU", "EC", "PS", "MA", "ES", "GG", "AN", "RE", "UU", "OL", "CH", "BI", "HI", "EN", "KP", "MU", "CS"]
+
+TITLE_TEMPLATES = [
+    "{code} bird?", "Is {code} an easy course?", "{code} vs {code2}", "Thoughts on {code}?",
+    "Easiest electives for next term", "{code} midterm tips", "Looking for bird courses",
+    "Anyone taken {code} online?", "{code} workload", "Need an easy A elective", "{code} review"
+]
+
+FILLER_SENTENCES = [
+    "I took it last winter with a different prof.",
+    "The lectures are recorded so you can watch them whenever.",
+    "There are weekly readings but nobody really does them.",
+    "Honestly it depends a lot on who is teaching it.",
+    "We had two assignments, a midterm and a final.",
+    "The tutorial sections were mandatory and graded.",
+    "I needed it for my minor so I did not have a choice.",
+    "The textbook is optional and the slides cover everything.",
+    "Class average was somewhere around a B.",
+    "Most of the marks come from quizzes on MyLS."
+]
+
+BIRD_SENTENCES = [
+    "It is a total bird, easy A if you show up.",
+    "Minimal work and the grading is very fair.",
+    "Great GPA booster, no midterm and an open book final.",
+    "Super straightforward and the prof is great.",
+    "Not difficult at all, just doable weekly quizzes.",
+    "Light workload and pretty interesting content."
+]
+
+ANTI_BIRD_SENTENCES = [
+    "Avoid it, the midterm was really hard.",
+    "Heavy workload and a tough grader.",
+    "Half the class failed the final exam.",
+    "It is not a bird course, stay away.",
+    "Group project and presentation worth 40 percent, very time-consuming.",
+    "Confusing lectures and harsh marking."
+]
+
+def course_pool(rng: random.Random, size: int = 120) -> List[str]:
+    """Distinct course codes in popularity order (see pick_course)"""
+    codes = set()
+    while len(codes) < size:
+        codes.add(f"{rng.choice(DEPARTMENTS)}{rng.choice([1, 1, 1, 2, 2, 3, 4])}{rng.randint(0, 9)}{rng.randint(0, 9)}")
+    codes = sorted(codes)
+    rng.shuffle(codes)
+    return codes
+
+def pick_course(rng: random.Random, codes: List[str]) -> str:
+    """Zipf-like popularity: a handful of courses dominate the discussion"""
+    return codes[min(len(codes) - 1, int(rng.paretovariate(1.2)) - 1)]
+
+def make_sentence(rng: random.Random, codes: List[str], code_density: float, bird_term_rate: float) -> str:
+    roll = rng.random()
+    if roll < bird_term_rate:
+        sentence = rng.choice(BIRD_SENTENCES if rng.random() < 0.6 else ANTI_BIRD_SENTENCES)
+    else:
+        sentence = rng.choice(FILLER_SENTENCES)
+    if rng.random() < code_density:
+        sentence = f"{pick_course(rng, codes)} {sentence[0].lower()}{sentence[1:]}"
+    return sentence
+
+def make_thread(rng: random.Random, index: int, codes: List[str], code_density: float,
+                bird_term_rate: float, megathread_rate: float) -> Dict[str, Any]:
+    code, code2 = pick_course(rng, codes), pick_course(rng, codes)
+    title = rng.choice(TITLE_TEMPLATES).format(code=code, code2=code2)
+
+    if rng.random() < megathread_rate:
+        # Megathreads ("bird course list 2024") run to hundreds of sentences naming many courses
+        title = "Bird course megathread"
+        sentence_count = rng.randint(150, 400)
+        density = min(1.0, code_density * 3)
+    elif rng.random() < 0.15:
+        sentence_count = 0  # Title-only posts
+        density = code_density
+    else:
+        sentence_count = max(1, int(rng.lognormvariate(1.3, 0.8)))
+        density = code_density
+    selftext = " ".join(make_sentence(rng, codes, density, bird_term_rate) for _ in range(sentence_count))
+
+    created = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc) + datetime.timedelta(minutes=rng.randint(0, 525600))
+    return {
+        "id": f"syn{index}",
+        "title": title,
+        "author": f"user{rng.randint(1, 5000)}",
+        "created": created.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+        "url": f"https://www.reddit.com/r/wlu/comments/syn{index}/",
+        "selftext": selftext,
+        "score": min(2000, int(rng.paretovariate(1.5)) - 1),
+        "num_comments": min(500, int(rng.paretovariate(1.3)) - 1),
+        "upvote_ratio": round(rng.uniform(0.5, 1.0), 2)
+    }
+
+def generate_corpus(thread_count: int, seed: int = 0, code_density: float = 0.35, bird_term_rate: float = 0.3,
+                    megathread_rate: float = 0.01) -> List[Dict[str, Any]]:
+    """Deterministic synthetic corpus for a given seed"""
+    rng = random.Random(seed)
+    codes = course_pool(rng)
+    return [
+        make_thread(rng, index, codes, code_density, bird_term_rate, megathread_rate)
+        for index in range(thread_count)
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic Reddit thread corpus for offline runs')
+    parser.add_argument('output_file', help='Where to write the corpus (.ndjson for one thread per line)')
+    parser.add_argument('--threads', type=int, default=1000, help='Number of threads to generate')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed')
+    parser.add_argument('--code-density', type=float, default=0.35, help='Share of sentences naming a course')
+    parser.add_argument('--bird-term-rate', type=float, default=0.3, help='Share of sentences with bird/anti-bird terms')
+    parser.add_argument('--megathread-rate', type=float, default=0.01, help='Share of threads that are megathreads')
+
+    args = parser.parse_args()
+    threads = generate_corpus(args.threads, args.seed, args.code_density, args.bird_term_rate, args.megathread_rate)
+    os.makedirs(os.path.dirname(os.path.abspath(args.output_file)), exist_ok=True)
+    if args.output_file.endswith(".ndjson"):
+        write_ndjson(threads, args.output_file)
+    else:
+        save_to_json(threads, args.output_file)
+
+if __name__ == "__main__":
+    main()
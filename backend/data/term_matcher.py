@@ -0,0 +1,105 @@
+import re
+from collections import Counter
+from typing import Dict, List, Tuple
+
+class TermMatcher:
+    """Match every term of a weighted lexicon against a text in a single scan.
+
+    The terms are compiled into one trie-shaped regex wrapped in a lookahead, so the
+    scan is linear in the length of the text rather than in the size of the lexicon.
+    Counting follows ``str.count`` semantics: plain substring matches, where a term
+    never overlaps itself but may overlap other terms (``hard`` inside ``really hard``).
+    """
+
+    def __init__(self, lexicons: List[Tuple[str, Dict[str, float]]]):
+        # lexicons is a list of (label prefix, {term: weight}) pairs, e.g. ("anti:", anti_bird_terms)
+        self.labels = []
+        self.weights = {}
+        self.order = {}
+        self._labels_by_term = {}
+        for prefix, terms in lexicons:
+            for term, weight in terms.items():
+                label = f"{prefix}{term}"
+                self.order[label] = len(self.labels)
+                self.labels.append(label)
+                self.weights[label] = weight
+                self._labels_by_term.setdefault(term, []).append(label)
+
+        terms = sorted(self._labels_by_term)
+        self._term_lengths = {term: len(term) for term in terms}
+
+        # Every term that matches at a position is a prefix of the longest term matching there,
+        # so one match per position plus the list of its lexicon prefixes recovers all hits.
+        self._prefix_terms = {
+            term: [other for other in terms if term.startswith(other)]
+            for term in terms
+        }
+        self.pattern = re.compile(f"(?=({self._trie_regex(terms)}))") if terms else None
+
+        # A term can only overlap its own previous occurrence if some proper prefix equals a suffix
+        self._self_overlapping = any(
+            term[:size] == term[-size:]
+            for term in terms
+            for size in range(1, len(term))
+        )
+
+    @staticmethod
+    def _trie_regex(terms: List[str]) -> str:
+        """Build an alternation that prefers the longest term at each position"""
+        trie = {}
+        for term in terms:
+            node = trie
+            for char in term:
+                node = node.setdefault(char, {})
+            node[""] = {}
+
+        def render(node: Dict[str, dict]) -> str:
+            branches = [re.escape(char) + render(child) for char, child in sorted(node.items()) if char]
+            if not branches:
+                return ""
+            body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+            if "" in node:
+                # Greedy optional group: try the longer continuation first
+                body = f"(?:{body})?"
+            return body
+
+        return render(trie)
+
+    def count(self, text: str) -> Dict[str, int]:
+        """Return {label: occurrences} for every lexicon term found in an already lower-cased text"""
+        if self.pattern is None:
+            return {}
+
+        counts = {}
+        if self._self_overlapping:
+            last_end = {}
+            for match in self.pattern.finditer(text):
+                start = match.start()
+                for term in self._prefix_terms[match.group(1)]:
+                    if start < last_end.get(term, 0):
+                        continue
+                    last_end[term] = start + self._term_lengths[term]
+                    counts[term] = counts.get(term, 0) + 1
+        else:
+            # No occurrence can overlap another of the same term, so every hit counts
+            for longest, hits in Counter(self.pattern.findall(text)).items():
+                for term in self._prefix_terms[longest]:
+                    counts[term] = counts.get(term, 0) + hits
+
+        found = {}
+        for term, count in counts.items():
+            for label in self._labels_by_term[term]:
+                found[label] = count
+        return {label: found[label] for label in sorted(found, key=self.order.__getitem__)}
+
+    def score(self, counts: Dict[str, int]) -> float:
+        """Weighted sum of label counts, accumulated in lexicon order"""
+        score = 0.0
+        for label, count in counts.items():
+            score += self.weights.get(label, 0) * count
+        return score
+
+    def match(self, text: str) -> Tuple[float, Dict[str, int]]:
+        """Return the weighted score and per-label counts from a single scan of ``text``"""
+        counts = self.count(text.lower())
+        return self.score(counts), counts
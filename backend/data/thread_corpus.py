@@ -0,0 +1,59 @@
+import re
+from typing import List, Dict, Any, Iterable, Optional
+from analysis_cache import content_hash
+from thread_store import parse_created
+
+# Same course code shape the analyzers use; titles are upper-cased first because the
+# course search endpoint matches codes case-insensitively
+COURSE_PATTERN = re.compile(r'\b[A-Z]{2,4}[0-9]{3,4}\b')
+
+ANALYSIS_KEYS = ("sentiment", "bird_terms", "courses")
+
+class ThreadCorpus:
+    """In-memory threads indexed by id and by the course codes in their titles.
+
+    Lets the detailed course stage reuse threads (and their analysis) that an earlier
+    stage already fetched instead of requesting and analyzing them again.
+    """
+
+    def __init__(self, threads: Iterable[Dict[str, Any]] = (), courses: Iterable[str] = None):
+        self.by_id = {}
+        self.by_course = {}  # code -> {thread id: None}, insertion ordered
+        self.courses = set(courses) if courses is not None else None
+        for thread in threads:
+            self.add(thread)
+
+    def __len__(self) -> int:
+        return len(self.by_id)
+
+    def __contains__(self, thread_id: str) -> bool:
+        return thread_id in self.by_id
+
+    def get(self, thread_id: str) -> Optional[Dict[str, Any]]:
+        return self.by_id.get(thread_id)
+
+    def add(self, thread: Dict[str, Any]) -> None:
+        """Add or replace a thread; with a course filter, threads naming none of those courses are skipped"""
+        codes = set(COURSE_PATTERN.findall(thread.get("title", "").upper()))
+        if self.courses is not None:
+            codes &= self.courses
+            if not codes:
+                return
+        self.by_id[thread["id"]] = thread
+        for code in codes:
+            self.by_course.setdefault(code, {})[thread["id"]] = None
+
+    def for_course(self, course_code: str, limit: int = None) -> List[Dict[str, Any]]:
+        """Threads with the course code in their title, newest first"""
+        threads = [self.by_id[thread_id] for thread_id in self.by_course.get(course_code, {})]
+        threads.sort(key=lambda t: parse_created(t.get("created")) or 0, reverse=True)
+        return threads[:limit] if limit is not None else threads
+
+    def analyzed(self, thread: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """thread with the analysis of its stored copy attached, if that copy is analyzed and has the same text"""
+        known = self.by_id.get(thread["id"])
+        if known is None or "sentiment" not in known or content_hash(known) != content_hash(thread):
+            return None
+        analyzed_thread = thread.copy()
+        analyzed_thread.update({key: known[key] for key in ANALYSIS_KEYS if key in known})
+        return analyzed_thread
@@ -0,0 +1,118 @@
+import json
+import sqlite3
+import datetime
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+
+# Trailing windows matching the Reddit API's `t` parameter
+TIME_PERIODS = {
+    'hour': datetime.timedelta(hours=1),
+    'day': datetime.timedelta(days=1),
+    'week': datetime.timedelta(weeks=1),
+    'month': datetime.timedelta(days=30),
+    'year': datetime.timedelta(days=365),
+    'all': None
+}
+
+def parse_created(created: str) -> Optional[float]:
+    """Convert a thread's ISO `created` timestamp to epoch seconds"""
+    try:
+        return datetime.datetime.fromisoformat(created.replace('Z', '+00:00')).timestamp()
+    except (AttributeError, ValueError, TypeError):
+        return None
+
+class ThreadStore:
+    """SQLite-backed store of raw Reddit threads keyed by thread id.
+
+    Each fetch is merged into the store, so later runs only need threads newer than
+    the high-water mark instead of re-pulling the whole search window. The mark is kept
+    per time period: a fetch for one search window says nothing about another.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS threads ("
+            " id TEXT PRIMARY KEY,"
+            " created_utc REAL,"
+            " data TEXT NOT NULL,"
+            " fetched_at REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS threads_created ON threads (created_utc)")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS high_water_marks ("
+            " time_period TEXT PRIMARY KEY,"
+            " created_utc REAL NOT NULL)"
+        )
+        self.conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM threads").fetchone()[0]
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def high_water_mark(self, time_period: str) -> Optional[float]:
+        """Creation time (epoch seconds) of the newest thread a completed fetch for time_period returned"""
+        row = self.conn.execute(
+            "SELECT created_utc FROM high_water_marks WHERE time_period = ?", (time_period,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def advance_high_water_mark(self, time_period: str, threads: List[Dict[str, Any]]) -> Optional[float]:
+        """Move time_period's mark up to the newest of threads, which must be a complete fetch; returns the mark"""
+        created = [parse_created(t.get('created')) for t in threads]
+        newest = max((c for c in created if c is not None), default=None)
+        mark = self.high_water_mark(time_period)
+        if newest is not None and (mark is None or newest > mark):
+            self.conn.execute(
+                "INSERT OR REPLACE INTO high_water_marks (time_period, created_utc) VALUES (?, ?)",
+                (time_period, newest)
+            )
+            self.conn.commit()
+            mark = newest
+        return mark
+
+    def merge(self, threads: List[Dict[str, Any]]) -> Tuple[int, int]:
+        """Insert new threads and refresh stored ones; returns (inserted, updated)"""
+        fetched_at = datetime.datetime.now(datetime.timezone.utc).timestamp()
+        ids = list({t['id'] for t in threads})
+
+        known = set()
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            rows = self.conn.execute(
+                f"SELECT id FROM threads WHERE id IN ({','.join('?' * len(chunk))})", chunk
+            )
+            known.update(row[0] for row in rows)
+
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO threads (id, created_utc, data, fetched_at) VALUES (?, ?, ?, ?)",
+            [(t['id'], parse_created(t.get('created')), json.dumps(t), fetched_at) for t in threads]
+        )
+        self.conn.commit()
+
+        return len(ids) - len(known), len(known)
+
+    def load(self, time_period: str = 'all') -> List[Dict[str, Any]]:
+        """Stored threads created within the trailing time period, newest first"""
+        return list(self.iter_threads(time_period))
+
+    def iter_threads(self, time_period: str = 'all') -> Iterator[Dict[str, Any]]:
+        """Stream stored threads for the time period without loading them all at once"""
+        window = TIME_PERIODS.get(time_period)
+        if window is None:
+            rows = self.conn.execute("SELECT data FROM threads ORDER BY created_utc DESC")
+        else:
+            cutoff = (datetime.datetime.now(datetime.timezone.utc) - window).timestamp()
+            rows = self.conn.execute(
+                "SELECT data FROM threads WHERE created_utc >= ? ORDER BY created_utc DESC", (cutoff,)
+            )
+        for row in rows:
+            yield json.loads(row[0])
@@ -14,8 +14,10 @@ app.get('/api/bird-courses', async (req, res) => {
   try {
     const limit = parseInt(req.query.limit) || 100;
     const timePeriod = req.query.timePeriod || 'year';
+    // Optional epoch seconds: return every thread created after this time (paging past limit)
+    const since = req.query.since ? parseInt(req.query.since) : null;
     
-    const threads = await redditService.getBirdCourseThreads(limit, timePeriod);
+    const threads = await redditService.getBirdCourseThreads(limit, timePeriod, since);
     res.json(threads);
   } catch (error) {
     console.error('Error fetching bird courses:', error);
@@ -52,6 +54,37 @@ app.get('/api/course-threads/:courseCode', async (req, res) => {
   }
 });
 
+// Batch endpoint: POST { codes: [...], limit } and receive one NDJSON line per course
+// ({ code, threads } or { code, error }) as soon as that course's searches finish
+app.post('/api/course-threads', async (req, res) => {
+  const codes = Array.isArray(req.body?.codes) ? req.body.codes : null;
+  const limit = parseInt(req.body?.limit) || 25;
+
+  if (!codes || codes.length === 0) {
+    return res.status(400).json({ error: 'Expected a non-empty "codes" array' });
+  }
+
+  const courseCodes = [...new Set(codes.map(code => String(code).toUpperCase()))];
+  const invalid = courseCodes.filter(code => !/^[A-Z]{2,4}[0-9]{3,4}$/.test(code));
+  if (invalid.length > 0) {
+    return res.status(400).json({ error: `Invalid course code format: ${invalid.join(', ')}. Expected format: XX123 or XXX123` });
+  }
+
+  res.status(200);
+  res.setHeader('Content-Type', 'application/x-ndjson');
+
+  for (const courseCode of courseCodes) {
+    try {
+      const threads = await redditService.getCourseSpecificThreads(courseCode, limit);
+      res.write(JSON.stringify({ code: courseCode, threads }) + '\n');
+    } catch (error) {
+      console.error(`Error fetching threads for course ${courseCode}:`, error);
+      res.write(JSON.stringify({ code: courseCode, error: error.message }) + '\n');
+    }
+  }
+  res.end();
+});
+
 // Health check route
 app.get('/health', (req, res) => {
   res.status(200).send('OK');
@@ -73,7 +73,25 @@ class RedditService {
     }
   }
 
-  async getBirdCourseThreads(limit = 100, timePeriod = 'year') {
+  formatBirdCourseThread(data) {
+    return {
+      id: data.id,
+      title: data.title,
+      author: data.author,
+      created: new Date(data.created_utc * 1000).toISOString(),
+      url: `https://www.reddit.com${data.permalink}`,
+      selftext: data.selftext,
+      score: data.score,
+      num_comments: data.num_comments,
+      upvote_ratio: data.upvote_ratio
+    };
+  }
+
+  async getBirdCourseThreads(limit = 100, timePeriod = 'year', since = null) {
+    if (since) {
+      return this.getBirdCourseThreadsSince(timePeriod, since);
+    }
+
     return this.makeRateLimitedRequest(async () => {
       const response = await axios({
         method: 'get',
@@ -94,23 +112,48 @@ class RedditService {
         return [];
       }
 
-      return response.data.data.children.map(post => {
-        const data = post.data;
-        return {
-          id: data.id,
-          title: data.title,
-          author: data.author,
-          created: new Date(data.created_utc * 1000).toISOString(),
-          url: `https://www.reddit.com${data.permalink}`,
-          selftext: data.selftext,
-          score: data.score,
-          num_comments: data.num_comments,
-          upvote_ratio: data.upvote_ratio
-        };
-      });
+      return response.data.data.children.map(post => this.formatBirdCourseThread(post.data));
     });
   }
 
+  // Incremental fetch: page through the newest posts until one is at or before `since`
+  // (or the listing ends), so a burst of new threads is never cut off at one page
+  async getBirdCourseThreadsSince(timePeriod, since) {
+    const threads = [];
+    let after = null;
+    do {
+      const listing = await this.makeRateLimitedRequest(async () => {
+        const response = await axios({
+          method: 'get',
+          url: 'https://www.reddit.com/r/wlu/search.json',
+          params: {
+            q: 'bird course',
+            restrict_sr: 'on',
+            t: timePeriod,
+            limit: 100,
+            sort: 'new',
+            after: after
+          },
+          headers: {
+            'User-Agent': this.userAgent
+          }
+        });
+        return response.data?.data;
+      });
+
+      if (!listing?.children) break;
+
+      const posts = listing.children.map(post => post.data);
+      const newer = posts.filter(data => data.created_utc > since);
+      threads.push(...newer.map(data => this.formatBirdCourseThread(data)));
+      if (newer.length < posts.length) break; // Reached the high-water mark
+
+      after = listing.after;
+    } while (after);
+
+    return threads;
+  }
+
   async getTopBirdCourses(count = 10) {
     // This would be based on processed data from sentiment analysis
     // For now, just return placeholder data to show the API structure